@@ -6,15 +6,34 @@ This module demonstrates how to detect the ecosystem/vendor of a Nix package
 from its derivation path and metadata. This information can be used to filter
 CVE matches and reduce false positives in vulnerability scanning.
 
+Existing .drv files are parsed (ATerm, via mmap) so build inputs and the
+builder can classify packages whose names alone are ambiguous; parsed
+derivations are cached on disk by store hash. Given NVD JSON feeds, the
+matched CVEs are cached too, so a rescan only matches new store paths.
+
 Usage:
     python ecosystem_detector.py /nix/store/xxx-network-3.2.8.0.drv
+    python ecosystem_detector.py --closure /run/current-system > closure.jsonl
+    python ecosystem_detector.py --closure /run/current-system --nvd ~/nvd-feeds
 """
 
+import argparse
+import collections
+import gzip
+import hashlib
 import json
+import lzma
+import mmap
+import os
 import re
+import sqlite3
+import subprocess
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import cached_property, lru_cache
 from pathlib import Path
-from typing import Optional, Dict, Set
+from typing import Optional, Dict, FrozenSet, Iterable, List, Set
 
 # Mapping of path patterns to ecosystems
 ECOSYSTEM_PATTERNS = {
@@ -27,7 +46,7 @@ ECOSYSTEM_PATTERNS = {
     ],
     'pypi': [
         r'python\d*Packages',
-        r'python\d+-',
+        r'python\d+(?:\.\d+)?-',  # python3.12-requests
         r'pip-',
         r'\.whl$',
     ],
@@ -84,17 +103,101 @@ FALSE_POSITIVE_VENDORS: Dict[tuple, Set[str]] = {
     ('hackage', 'idna'): {'idna_project'},
     # Add more as discovered...
 }
+# Normalised once at import so should_filter_cve is a plain set lookup
+FALSE_POSITIVE_VENDORS = {
+    key: frozenset(vendor.lower() for vendor in vendors)
+    for key, vendors in FALSE_POSITIVE_VENDORS.items()
+}
+
+# Vendors whose CVEs never apply to packages from a known ecosystem
+COMMERCIAL_VENDORS: FrozenSet[str] = frozenset({
+    'fidelis', 'hashicorp', 'cloudflare', 'f-secure', 'jenkins',
+    'vmware', 'redhat', 'microsoft', 'oracle', 'cisco', 'sap',
+    'adobe', 'apple', 'google', 'amazon', 'ibm', 'dell', 'hp',
+})
 
 # Build inputs that indicate ecosystem
+# Matched exactly against each input derivation's package name (see
+# input_pname). An interpreter alone is no evidence: C packages such as
+# protobuf or anything built with meson take python3 as an input, so
+# pypi relies on its packaging tools instead.
 BUILD_INPUT_INDICATORS = {
     'hackage': ['ghc', 'cabal-install', 'haskell-language-server'],
-    'pypi': ['python3', 'pip', 'setuptools'],
+    'pypi': ['pip', 'setuptools', 'wheel', 'pypa-build-hook', 'pypa-install-hook'],
     'npm': ['nodejs', 'npm'],
     'crates.io': ['rustc', 'cargo'],
     'go': ['go'],
 }
 
 
+# Patterns are compiled once, lowercased, and matched against the lowercased
+# path: re.IGNORECASE and capture groups both disable the regex engine's
+# literal-prefix scan, which made matching ~10x slower. Lowercasing is safe
+# because the patterns use no uppercase escapes (\D, \S, \W).
+_PATH_PATTERNS = tuple(
+    (ecosystem, re.compile('|'.join(p.lower() for p in patterns)))
+    for ecosystem, patterns in ECOSYSTEM_PATTERNS.items()
+)
+
+# One flat alternation rejects most store paths in a single scan; only
+# matching paths are checked per ecosystem, in priority order
+_ANY_PATH_PATTERN = re.compile(
+    '|'.join(p.lower() for patterns in ECOSYSTEM_PATTERNS.values() for p in patterns)
+)
+
+
+# Store hashes are random base-32 and can spell pattern fragments (ghc7...)
+_STORE_HASHES = re.compile(r'(?<=/)[0-9a-df-np-sv-z]{32}-')
+
+
+def classify_path(path_str: str) -> Optional[str]:
+    """Ecosystem of a store or .drv path from ECOSYSTEM_PATTERNS alone."""
+    path_str = _STORE_HASHES.sub('', path_str).lower()
+    if not _ANY_PATH_PATTERN.search(path_str):
+        return None
+    for ecosystem, pattern in _PATH_PATTERNS:
+        if pattern.search(path_str):
+            return ecosystem
+    return None
+
+
+_INPUT_ECOSYSTEMS = tuple(BUILD_INPUT_INDICATORS)
+_INPUT_INDICATOR_SETS = tuple(
+    frozenset(BUILD_INPUT_INDICATORS[ecosystem]) for ecosystem in _INPUT_ECOSYSTEMS
+)
+
+# nixpkgs prefixes Python packages with their interpreter: python3.12-pip
+_PYTHON_PREFIX = re.compile(r'^python\d+(\.\d+)*-')
+
+
+def input_pname(input_path: str) -> str:
+    """
+    Package name of an input derivation, without store hash and version.
+
+    >>> input_pname('/nix/store/0c7r5n6a9x3jg5wm4wcbcmb2yk1bq2ld-pango-1.51.0.drv')
+    'pango'
+    >>> input_pname('/nix/store/0c7r5n6a9x3jg5wm4wcbcmb2yk1bq2ld-python3.12-pip-24.0.drv')
+    'pip'
+    """
+    name, _ = extract_name_version(input_path)
+    return _PYTHON_PREFIX.sub('', name)
+
+
+@lru_cache(maxsize=65536)
+def _input_rank(input_path: str) -> int:
+    """
+    Priority of the BUILD_INPUT_INDICATORS ecosystem an input belongs to.
+
+    Memoized: the same input derivations (stdenv, compilers) are shared by
+    most of a closure.
+    """
+    pname = input_pname(input_path)
+    for rank, indicators in enumerate(_INPUT_INDICATOR_SETS):
+        if pname in indicators:
+            return rank
+    return len(_INPUT_ECOSYSTEMS)
+
+
 def detect_ecosystem(drv_path: str, drv_content: Optional[dict] = None) -> Optional[str]:
     """
     Detect the ecosystem of a Nix derivation.
@@ -105,34 +208,67 @@ def detect_ecosystem(drv_path: str, drv_content: Optional[dict] = None) -> Optio
 
     Returns:
         Ecosystem identifier (e.g., 'hackage', 'pypi') or None if unknown
+
+    Build inputs count by package name only, not by substring:
+
+    >>> h = '/nix/store/1ghc7zk3yq9d0w2pghcx5v6m8r4n1sai-'
+    >>> detect_ecosystem(h + 'gtk+3-3.24.41.drv', {'inputDrvs': {h + 'pango-1.51.0.drv': []}})
+    >>> detect_ecosystem(h + 'protobuf-25.3.drv', {'inputDrvs': {h + 'python3-3.12.2.drv': []}})
+    >>> detect_ecosystem(h + 'zlib-1.3.1.drv', {'inputDrvs': {h + 'bash-5.2.drv': []}})
+    >>> detect_ecosystem(h + 'foo-1.0.drv', {'inputDrvs': {h + 'go-1.22.1.drv': []}})
+    'go'
+    """
+    return ecosystem_evidence(drv_path, drv_content)[0]
+
+
+def ecosystem_evidence(drv_path: str, drv_content: Optional[dict] = None) -> tuple:
     """
-    path_str = str(drv_path)
+    Detect the ecosystem of a Nix derivation along with what it was based on.
 
+    Returns:
+        (ecosystem, source) where source is 'path', 'builder' or 'inputs',
+        or (None, None) if unknown
+    """
     # Check path patterns
-    for ecosystem, patterns in ECOSYSTEM_PATTERNS.items():
-        for pattern in patterns:
-            if re.search(pattern, path_str, re.IGNORECASE):
-                return ecosystem
+    ecosystem = classify_path(str(drv_path))
+    if ecosystem:
+        return ecosystem, 'path'
 
     # Check derivation content if available
     if drv_content:
         # Check builder
         builder = drv_content.get('builder', '')
         if 'ghc' in builder:
-            return 'hackage'
+            return 'hackage', 'builder'
         if 'python' in builder:
-            return 'pypi'
+            return 'pypi', 'builder'
 
         # Check build inputs
         inputs = drv_content.get('inputDrvs', {})
-        input_names = ' '.join(inputs.keys())
+        rank = min(map(_input_rank, inputs), default=len(_INPUT_ECOSYSTEMS))
+        if rank < len(_INPUT_ECOSYSTEMS):
+            return _INPUT_ECOSYSTEMS[rank], 'inputs'
 
-        for ecosystem, indicators in BUILD_INPUT_INDICATORS.items():
-            for indicator in indicators:
-                if indicator in input_names:
-                    return ecosystem
+    return None, None
 
-    return None
+
+def classify_many(paths: Iterable[str],
+                  drv_contents: Optional[Dict[str, dict]] = None) -> Dict[str, Optional[str]]:
+    """
+    Detect the ecosystem of many derivations in one call.
+
+    Args:
+        paths: Store or .drv paths (duplicates are classified once)
+        drv_contents: Optional parsed derivation content per path
+
+    Returns:
+        Dict mapping each path to its ecosystem or None
+    """
+    drv_contents = drv_contents or {}
+    return {
+        path: detect_ecosystem(path, drv_contents.get(path))
+        for path in dict.fromkeys(map(str, paths))
+    }
 
 
 def should_filter_cve(ecosystem: str, product: str, cve_vendor: str) -> bool:
@@ -147,28 +283,26 @@ def should_filter_cve(ecosystem: str, product: str, cve_vendor: str) -> bool:
     Returns:
         True if the CVE should be filtered (false positive)
     """
-    key = (ecosystem, product.lower())
-    if key in FALSE_POSITIVE_VENDORS:
-        return cve_vendor.lower() in FALSE_POSITIVE_VENDORS[key]
+    cve_vendor = cve_vendor.lower()
+    known = FALSE_POSITIVE_VENDORS.get((ecosystem, product.lower()))
+    if known is not None:
+        return cve_vendor in known
 
     # Generic filter: ecosystem packages shouldn't match commercial vendors
-    commercial_vendors = {
-        'fidelis', 'hashicorp', 'cloudflare', 'f-secure', 'jenkins',
-        'vmware', 'redhat', 'microsoft', 'oracle', 'cisco', 'sap',
-        'adobe', 'apple', 'google', 'amazon', 'ibm', 'dell', 'hp',
-    }
+    return bool(ecosystem) and cve_vendor in COMMERCIAL_VENDORS
 
-    if ecosystem and cve_vendor.lower() in commercial_vendors:
-        return True
 
-    return False
+# /nix/store/<32 base-32 chars>-<name>
+STORE_HASH = re.compile(r'^[0-9a-df-np-sv-z]{32}-')
 
 
 def extract_name_version(drv_path: str) -> tuple:
     """Extract package name and version from derivation path."""
-    # Remove .drv extension and store path prefix
-    name = Path(drv_path).stem
-    if name.startswith('/nix/store/'):
+    # Remove .drv extension and store hash prefix
+    name = Path(drv_path).name
+    if name.endswith('.drv'):
+        name = name[:-len('.drv')]
+    if STORE_HASH.match(name) or str(drv_path).startswith('/nix/store/'):
         name = name.split('-', 1)[1] if '-' in name else name
 
     # Split name-version
@@ -178,24 +312,351 @@ def extract_name_version(drv_path: str) -> tuple:
     return name, None
 
 
-def analyze_derivation(drv_path: str) -> dict:
+# ATerm tokens: a string (unrolled loop, so long env values stay fast),
+# punctuation, or a constructor name like Derive
+_ATERM_TOKEN = re.compile(
+    rb'"([^"\\]*(?:\\.[^"\\]*)*)"|([()\[\],])|([A-Za-z]+)', re.DOTALL
+)
+
+
+def _aterm_string(raw: bytes) -> str:
+    if b'\\' in raw:
+        # Nix escapes only \\ \" \n \r \t; split off escaped backslashes
+        # first so the remaining backslashes all start one of the others
+        raw = b'\\'.join(
+            part.replace(b'\\n', b'\n').replace(b'\\r', b'\r')
+            .replace(b'\\t', b'\t').replace(b'\\"', b'"')
+            for part in raw.split(b'\\\\')
+        )
+    return raw.decode('utf-8', 'surrogateescape')
+
+
+def parse_aterm(data) -> list:
+    """Parse a Derive(...) term from bytes or an mmap into nested lists."""
+    stack = [[]]
+    for match in _ATERM_TOKEN.finditer(data):
+        string, punct, _ = match.groups()
+        if string is not None:
+            stack[-1].append(_aterm_string(string))
+        elif punct in (b'(', b'['):
+            stack.append([])
+        elif punct in (b')', b']'):
+            if len(stack) < 2:
+                raise ValueError('Unbalanced derivation term')
+            term = stack.pop()
+            stack[-1].append(term)
+    if len(stack) != 1 or len(stack[0]) != 1:
+        raise ValueError('Truncated derivation term')
+    return stack[0][0]
+
+
+def parse_drv(drv_path: str) -> dict:
+    """
+    Parse a .drv file into the structure `nix derivation show` prints.
+
+    Args:
+        drv_path: Path to a /nix/store/*.drv file
+
+    Returns:
+        Dict with outputs, inputDrvs, inputSrcs, system, builder, args, env
+    """
+    with open(drv_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise ValueError(f'Empty derivation: {drv_path}')
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if data[:7] != b'Derive(':
+                raise ValueError(f'Not an ATerm derivation: {drv_path}')
+            term = parse_aterm(data)
+
+    outputs, input_drvs, input_srcs, system, builder, args, env = term
+    return {
+        'outputs': {
+            name: {'path': path, 'hashAlgo': algo, 'hash': hash_}
+            for name, path, algo, hash_ in outputs
+        },
+        'inputDrvs': {path: names for path, names in input_drvs},
+        'inputSrcs': input_srcs,
+        'system': system,
+        'builder': builder,
+        'args': args,
+        'env': dict(env),
+    }
+
+
+def slim_drv(drv: dict) -> dict:
+    """Keep the fields of a parsed derivation the detector uses."""
+    env = drv['env']
+    return {
+        'builder': drv['builder'],
+        'system': drv['system'],
+        'inputDrvs': drv['inputDrvs'],
+        'outputs': {name: out['path'] for name, out in drv['outputs'].items()},
+        'env': {k: env[k] for k in ('name', 'pname', 'version') if k in env},
+    }
+
+
+def default_cache_path() -> str:
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+    return os.path.join(cache_home, 'ecosystem-detector', 'drv.sqlite')
+
+
+class DrvCache:
+    """
+    On-disk cache of parsed derivations, keyed by store hash.
+
+    Store paths are immutable, so an entry never goes stale. Only the
+    fields the detector uses are kept (not env or args, which can be large).
+
+    Analysis results with matched CVEs are kept alongside, per vendor hint
+    (an inherited hint can change when new dependents appear) and tagged
+    with the advisory revision they were matched against.
+    """
+
+    # Inserts per transaction
+    COMMIT_EVERY = 500
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or default_cache_path()
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._conn = sqlite3.connect(self.path)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS drvs (hash TEXT PRIMARY KEY, content TEXT NOT NULL)'
+        )
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS results (hash TEXT NOT NULL, vendor_hint TEXT NOT NULL, '
+            'revision TEXT NOT NULL, result TEXT NOT NULL, PRIMARY KEY (hash, vendor_hint))'
+        )
+        self._pending = 0
+
+    @staticmethod
+    def key(drv_path: str) -> str:
+        """The store hash of a path (/nix/store/<hash>-<name>.drv)."""
+        return os.path.basename(drv_path).split('-', 1)[0]
+
+    def lookup(self, drv_path: str) -> Optional[dict]:
+        """Return the cached (slim) derivation, or None."""
+        row = self._conn.execute(
+            'SELECT content FROM drvs WHERE hash = ?', (self.key(drv_path),)
+        ).fetchone()
+        return json.loads(row[0]) if row is not None else None
+
+    def put(self, drv_path: str, content: dict):
+        self._conn.execute(
+            'INSERT OR REPLACE INTO drvs (hash, content) VALUES (?, ?)',
+            (self.key(drv_path), json.dumps(content)),
+        )
+        self._pending += 1
+        if self._pending >= self.COMMIT_EVERY:
+            self.commit()
+
+    def get(self, drv_path: str) -> dict:
+        """Return the (slim) parsed derivation, parsing it on a cache miss."""
+        content = self.lookup(drv_path)
+        if content is None:
+            content = slim_drv(parse_drv(drv_path))
+            self.put(drv_path, content)
+        return content
+
+    def lookup_result(self, drv_path: str, vendor_hint: Optional[str],
+                      revision: str) -> Optional[dict]:
+        """Return the cached result if it was matched against revision."""
+        row = self._conn.execute(
+            'SELECT result FROM results WHERE hash = ? AND vendor_hint = ? AND revision = ?',
+            (self.key(drv_path), vendor_hint or '', revision),
+        ).fetchone()
+        return json.loads(row[0]) if row is not None else None
+
+    def put_result(self, drv_path: str, vendor_hint: Optional[str],
+                   revision: str, result: dict):
+        self._conn.execute(
+            'INSERT OR REPLACE INTO results (hash, vendor_hint, revision, result) '
+            'VALUES (?, ?, ?, ?)',
+            (self.key(drv_path), vendor_hint or '', revision, json.dumps(result)),
+        )
+        self._pending += 1
+        if self._pending >= self.COMMIT_EVERY:
+            self.commit()
+
+    def commit(self):
+        self._conn.commit()
+        self._pending = 0
+
+    def close(self):
+        self.commit()
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# nvdcve-1.1-2023.json.gz (NVD 1.1 feeds) or CVE-2023.json.xz (API 2.0 mirrors)
+NVD_FEED = re.compile(r'\.json(\.gz|\.xz)?$')
+
+
+# Components version keys are padded to with zeros
+VERSION_KEY_WIDTH = 16
+
+# Part of the advisory revision: bump when matching (or the result shape)
+# changes so cached results are re-matched
+MATCHER_VERSION = 4
+
+
+# Tags that mark a pre-release; a and b only when a number follows (1.0a1)
+PRE_RELEASE_TAGS = frozenset({'alpha', 'beta', 'rc', 'pre', 'dev'})
+PRE_RELEASE_LETTERS = frozenset({'a', 'b'})
+
+
+def version_key(version: str) -> tuple:
+    """Sort key for version strings: numbers numerically, 1.0rc1 before 1.0.
+
+    Trailing zero components are dropped and missing ones count as zero,
+    so 1.0 and 1.0.0 compare equal. Other letters are post-releases
+    (OpenSSL's 1.1.1a follows 1.1.1).
+
+    >>> version_key('1.0a1') < version_key('1.0rc1') < version_key('1') == version_key('1.0.0')
+    True
+    >>> version_key('1.1.1') < version_key('1.1.1a') < version_key('1.1.1w') < version_key('1.1.2')
+    True
+    """
+    parts = re.findall(r'\d+|[a-z]+', version.lower())
+    key = []
+    for i, part in enumerate(parts):
+        if part.isdigit():
+            key.append((int(part), ''))
+        elif part in PRE_RELEASE_TAGS or (
+                part in PRE_RELEASE_LETTERS and i + 1 < len(parts) and parts[i + 1].isdigit()):
+            key.append((-1, part))
+        else:
+            key.append((0, part))
+    while key and key[-1] == (0, ''):
+        key.pop()
+    return tuple(key) + ((0, ''),) * max(1, VERSION_KEY_WIDTH - len(key))
+
+
+class Advisories:
+    """
+    CVE matcher over a directory of NVD JSON feeds.
+
+    The revision identifies the feed contents without reading them; the
+    product index is only built (which is slow) when something needs
+    matching.
+    """
+
+    def __init__(self, nvd_dir: str):
+        self.feeds = sorted(
+            p for p in Path(nvd_dir).iterdir() if p.is_file() and NVD_FEED.search(p.name)
+        )
+        if not self.feeds:
+            raise ValueError(f'No NVD JSON feeds in {nvd_dir}')
+
+    @cached_property
+    def revision(self) -> str:
+        digest = hashlib.sha256(f'matcher {MATCHER_VERSION}\n'.encode())
+        for feed in self.feeds:
+            st = feed.stat()
+            digest.update(f'{feed.name}\0{st.st_size}\0{st.st_mtime_ns}\n'.encode())
+        return digest.hexdigest()[:16]
+
+    @cached_property
+    def by_product(self) -> Dict[str, list]:
+        """Map product -> [(cve_id, vendor, version, range bounds...)]."""
+        index = collections.defaultdict(list)
+        for feed in self.feeds:
+            opener = {'.gz': gzip.open, '.xz': lzma.open}.get(feed.suffix, open)
+            with opener(feed, 'rt', encoding='utf-8') as f:
+                data = json.load(f)
+            items = (data.get('CVE_Items') or data.get('cve_items')
+                     or data.get('vulnerabilities') or [])
+            for item in items:
+                cve = item.get('cve', item)
+                cve_id = cve.get('id') or cve.get('CVE_data_meta', {}).get('ID')
+                configurations = item.get('configurations') or cve.get('configurations')
+                for match in self._cpe_matches(configurations):
+                    # cpe:2.3:a:<vendor>:<product>:<version>:...
+                    parts = (match.get('cpe23Uri') or match.get('criteria', '')).split(':')
+                    if len(parts) < 6 or not match.get('vulnerable', True):
+                        continue
+                    index[parts[4].lower()].append((
+                        cve_id, parts[3].lower(), parts[5],
+                        match.get('versionStartIncluding'),
+                        match.get('versionStartExcluding'),
+                        match.get('versionEndIncluding'),
+                        match.get('versionEndExcluding'),
+                    ))
+        return dict(index)
+
+    @classmethod
+    def _cpe_matches(cls, node) -> Iterable[dict]:
+        """Yield every cpe_match/cpeMatch entry below a configurations node."""
+        if isinstance(node, list):
+            for child in node:
+                yield from cls._cpe_matches(child)
+        elif isinstance(node, dict):
+            if 'cpe23Uri' in node or 'criteria' in node:
+                yield node
+                return
+            for child in node.values():
+                if isinstance(child, (list, dict)):
+                    yield from cls._cpe_matches(child)
+
+    def match(self, name: str, version: Optional[str],
+              ecosystem: Optional[str]) -> List[str]:
+        """
+        Return the CVE ids affecting name-version.
+
+        Args:
+            name: Package name (matched against the CPE product)
+            version: Package version; unversioned packages match nothing
+            ecosystem: Vendor hint; CVEs of mismatched vendors are dropped
+
+        Returns:
+            Sorted list of CVE ids
+        """
+        if not version:
+            return []
+        key = version_key(version)
+        cves = set()
+        for entry in self.by_product.get(name.lower(), ()):
+            cve_id, vendor, exact, start_incl, start_excl, end_incl, end_excl = entry
+            if cve_id in cves or should_filter_cve(ecosystem, name, vendor):
+                continue
+            # '*' is any version, subject to the range bounds
+            if exact not in ('*', '-') and version_key(exact) != key:
+                continue
+            if ((start_incl and key < version_key(start_incl))
+                    or (start_excl and key <= version_key(start_excl))
+                    or (end_incl and key > version_key(end_incl))
+                    or (end_excl and key >= version_key(end_excl))):
+                continue
+            cves.add(cve_id)
+        return sorted(cves)
+
+
+def analyze_derivation(drv_path: str, drv_content: Optional[dict] = None) -> dict:
     """
     Analyze a derivation and return ecosystem information.
 
     Args:
         drv_path: Path to derivation
+        drv_content: Optional parsed derivation (see parse_drv / DrvCache)
 
     Returns:
         Dict with analysis results
     """
     name, version = extract_name_version(drv_path)
-    ecosystem = detect_ecosystem(drv_path)
+    ecosystem, source = ecosystem_evidence(drv_path, drv_content)
 
     result = {
         'path': drv_path,
         'name': name,
         'version': version,
         'ecosystem': ecosystem,
+        'ecosystem_source': source,
         'vendor_hint': ecosystem,  # Can be used for CVE filtering
     }
 
@@ -203,11 +664,161 @@ def analyze_derivation(drv_path: str) -> dict:
     if ecosystem:
         key = (ecosystem, name.lower())
         if key in FALSE_POSITIVE_VENDORS:
-            result['known_fp_vendors'] = list(FALSE_POSITIVE_VENDORS[key])
+            result['known_fp_vendors'] = sorted(FALSE_POSITIVE_VENDORS[key])
 
     return result
 
 
+def resolve_drv(path: str) -> str:
+    """Return the .drv for a derivation or output path (e.g. a system closure)."""
+    if path.endswith('.drv'):
+        return path
+    # Output paths only know their deriver through the Nix database
+    deriver = subprocess.run(
+        ['nix-store', '--query', '--deriver', os.path.realpath(path)],
+        capture_output=True, text=True, check=True,
+    ).stdout.strip()
+    if not deriver.endswith('.drv') or not os.path.exists(deriver):
+        raise ValueError(f'No derivation available for {path}')
+    return deriver
+
+
+def _parse_and_classify(drv_path: str) -> tuple:
+    """Process pool worker: (path, slim content, (ecosystem, source), error)."""
+    try:
+        content = slim_drv(parse_drv(drv_path))
+    except (OSError, ValueError) as e:
+        return drv_path, None, ecosystem_evidence(drv_path), str(e)
+    return drv_path, content, ecosystem_evidence(drv_path, content), None
+
+
+def walk_closure(root: str, cache: Optional[DrvCache] = None,
+                 jobs: Optional[int] = None) -> dict:
+    """
+    Parse and classify every derivation reachable from root via inputDrvs.
+
+    The graph is walked breadth-first; each level's cache misses are parsed
+    and classified across a process pool.
+
+    Returns:
+        Dict mapping each .drv path to (content, (ecosystem, source), error)
+    """
+    nodes = {}
+    seen = {root}
+    frontier = [root]
+    with ProcessPoolExecutor(jobs) as pool:
+        while frontier:
+            misses = []
+            for path in frontier:
+                content = cache.lookup(path) if cache else None
+                if content is None:
+                    misses.append(path)
+                else:
+                    nodes[path] = (content, ecosystem_evidence(path, content), None)
+            chunksize = max(1, len(misses) // ((jobs or os.cpu_count() or 1) * 4))
+            for path, content, evidence, error in pool.map(
+                    _parse_and_classify, misses, chunksize=chunksize):
+                nodes[path] = (content, evidence, error)
+                if cache and content is not None:
+                    cache.put(path, content)
+
+            next_frontier = []
+            for path in frontier:
+                content = nodes[path][0] or {}
+                for child in content.get('inputDrvs', {}):
+                    if child not in seen:
+                        seen.add(child)
+                        next_frontier.append(child)
+            frontier = next_frontier
+    return nodes
+
+
+def with_cves(result: dict, advisories: Advisories,
+              cache: Optional[DrvCache] = None) -> dict:
+    """
+    Add the CVEs matching result (with its vendor_hint) as result['cves'].
+
+    With a cache, results are stored per advisory revision, so only new
+    derivations are matched until the feeds change.
+    """
+    path, hint = result['path'], result['vendor_hint']
+    if cache is not None:
+        cached = cache.lookup_result(path, hint, advisories.revision)
+        if cached is not None:
+            return cached
+    result['cves'] = advisories.match(result['name'], result['version'], hint)
+    if cache is not None and 'error' not in result:
+        cache.put_result(path, hint, advisories.revision, result)
+    return result
+
+
+def scan_closure(root: str, cache: Optional[DrvCache] = None,
+                 jobs: Optional[int] = None, out=sys.stdout,
+                 advisories: Optional[Advisories] = None) -> collections.Counter:
+    """
+    Analyze a whole closure, writing one JSON result per line to out.
+
+    Derivations the detector can't classify inherit an ecosystem hint when
+    every derivation that depends on them agrees on one (e.g. a
+    network-3.1 used only by Haskell packages); shared inputs like stdenv
+    get none. Only hints from path or builder evidence (or inherited from
+    such) are passed on; input-name matches are too weak to spread.
+    Each result records where its hint came from in ecosystem_source.
+    Results are written parents first, with matched CVEs when advisories
+    are given.
+
+    Returns:
+        Count of derivations per ecosystem (None for unknown)
+    """
+    nodes = walk_closure(root, cache, jobs)
+
+    parents = collections.defaultdict(list)
+    for path, (content, _, _) in nodes.items():
+        for child in (content or {}).get('inputDrvs', {}):
+            parents[child].append(path)
+
+    # Kahn's algorithm: a node is finished once all its parents are
+    pending = {path: len(parents[path]) for path in nodes}
+    ready = collections.deque(path for path, n in pending.items() if n == 0)
+    effective = {}
+    inheritable = {}
+    counts = collections.Counter()
+    while ready:
+        path = ready.popleft()
+        content, (ecosystem, source), error = nodes[path]
+        inherited = None
+        if ecosystem is None and parents[path]:
+            hints = {inheritable[parent] for parent in parents[path]}
+            if len(hints) == 1:
+                inherited = hints.pop()
+        effective[path] = ecosystem or inherited
+        if inherited:
+            source = 'inherited'
+        inheritable[path] = effective[path] if source != 'inputs' else None
+
+        result = analyze_derivation(path, content)
+        result['ecosystem'] = ecosystem
+        result['ecosystem_source'] = source
+        result['vendor_hint'] = effective[path]
+        if inherited:
+            result['inherited_ecosystem'] = inherited
+            key = (inherited, result['name'].lower())
+            if key in FALSE_POSITIVE_VENDORS:
+                result['known_fp_vendors'] = sorted(FALSE_POSITIVE_VENDORS[key])
+        if error:
+            result['error'] = error
+        if advisories:
+            result = with_cves(result, advisories, cache)
+        out.write(json.dumps(result) + '\n')
+        counts[effective[path]] += 1
+
+        for child in (content or {}).get('inputDrvs', {}):
+            pending[child] -= 1
+            if not pending[child]:
+                ready.append(child)
+    return counts
+
+
 def demo():
     """Demonstrate the ecosystem detection on sample paths."""
     test_paths = [
@@ -232,10 +843,67 @@ def demo():
             print(f"  Known FP Vendors: {result['known_fp_vendors']}")
 
 
-if __name__ == '__main__':
-    if len(sys.argv) > 1:
-        for path in sys.argv[1:]:
-            result = analyze_derivation(path)
-            print(json.dumps(result, indent=2))
-    else:
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Detect the ecosystem of Nix derivations')
+    parser.add_argument('paths', nargs='*', help='Derivation or store paths')
+    parser.add_argument('--closure', metavar='PATH',
+                        help='Scan every derivation PATH depends on, as JSON lines')
+    parser.add_argument('--jobs', type=int, help='Parser processes (default: CPUs)')
+    parser.add_argument('--cache', default=default_cache_path(),
+                        help='Parsed derivation cache (default: %(default)s)')
+    parser.add_argument('--no-cache', action='store_true')
+    parser.add_argument('--nvd', metavar='DIR',
+                        help='Match CVEs from the NVD JSON feeds in DIR')
+    args = parser.parse_args()
+
+    if not args.paths and not args.closure:
         demo()
+        return 0
+
+    advisories = None
+    if args.nvd:
+        try:
+            advisories = Advisories(args.nvd)
+        except (OSError, ValueError) as e:
+            print(f"Cannot read advisories: {e}", file=sys.stderr)
+            return 1
+
+    cache = None if args.no_cache else DrvCache(args.cache)
+    try:
+        if args.closure:
+            try:
+                root = resolve_drv(args.closure)
+            except (OSError, ValueError, subprocess.CalledProcessError) as e:
+                print(f"Cannot resolve {args.closure}: {e}", file=sys.stderr)
+                return 1
+            started = time.monotonic()
+            counts = scan_closure(root, cache, args.jobs, advisories=advisories)
+            summary = ', '.join(
+                f"{ecosystem or 'unknown'}: {n}" for ecosystem, n in counts.most_common()
+            )
+            print(
+                f"Scanned {sum(counts.values())} derivations in "
+                f"{time.monotonic() - started:.1f}s ({summary})",
+                file=sys.stderr,
+            )
+
+        for path in args.paths:
+            drv_content = None
+            if path.endswith('.drv') and os.path.isfile(path):
+                try:
+                    drv_content = cache.get(path) if cache else slim_drv(parse_drv(path))
+                except (OSError, ValueError) as e:
+                    print(f"Could not parse {path}: {e}", file=sys.stderr)
+            result = analyze_derivation(path, drv_content)
+            if advisories:
+                # Only parsed store derivations have a hash to cache under
+                result = with_cves(result, advisories, cache if drv_content else None)
+            print(json.dumps(result, indent=2))
+    finally:
+        if cache:
+            cache.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
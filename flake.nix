@@ -62,22 +62,40 @@
         inputs.treefmt-nix.flakeModule
       ];
 
-      perSystem = _: {
-        treefmt = {
-          projectRootFile = "flake.nix";
-          settings.excludes = [ "flakes/**" ];
-          programs = {
-            nixfmt.enable = true;
-            deadnix.enable = true;
-            statix.enable = true;
+      perSystem =
+        { system, ... }:
+        let
+          pkgs-unstable = import inputs.nixpkgs-unstable {
+            inherit system;
+            config.allowUnfree = true;
+          };
+          mem0Python = import ./modules/nixos/mem0-python.nix pkgs-unstable;
+        in
+        {
+          treefmt = {
+            projectRootFile = "flake.nix";
+            settings.excludes = [ "flakes/**" ];
+            programs = {
+              nixfmt.enable = true;
+              deadnix.enable = true;
+              statix.enable = true;
+            };
           };
-        };
 
-        checks = {
-          # Only check the actual host build for now
-          rocinante-toplevel = self.nixosConfigurations.rocinante.config.system.build.toplevel;
+          checks = {
+            # The actual host build
+            rocinante-toplevel = self.nixosConfigurations.rocinante.config.system.build.toplevel;
+
+            # Runs in the build sandbox: no network, pinned by flake.lock. Local stand-in
+            # embedder/LLM and embedded Qdrant; fails on tool errors only, latency is
+            # reported in the build log but not gated (shared runners are too noisy).
+            mem0-bench = pkgs-unstable.runCommand "mem0-bench" { } ''
+              export HOME=$TMPDIR MEM0_TELEMETRY=False
+              ${mem0Python}/bin/python ${./modules/nixos/mem0}/bench.py --quick > $out
+              cat $out
+            '';
+          };
         };
-      };
 
       flake = {
         nixosConfigurations.rocinante = nixpkgs.lib.nixosSystem {
@@ -0,0 +1,9 @@
+# Prebuilt interpreter for the mem0 MCP server, shared by the NixOS module
+# (runtime = "nix") and the flake's offline benchmark check
+pkgs:
+pkgs.python3.withPackages (ps: [
+  ps.mem0ai
+  ps.mcp
+  ps.orjson
+  ps.pydantic
+])
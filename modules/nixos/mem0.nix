@@ -14,6 +14,37 @@ let
     inherit (pkgs.stdenv.hostPlatform) system;
     config.allowUnfree = true;
   };
+
+  # Prebuilt interpreter for runtime = "nix" (nothing is resolved at start)
+  pythonEnv = import ./mem0-python.nix pkgs-unstable;
+
+  serverCommand =
+    runtime:
+    if runtime == "nix" then
+      "${pythonEnv}/bin/python ${./mem0}/server.py"
+    else
+      ''${pkgs-unstable.uv}/bin/uv run --with mem0ai --with "mcp[cli]" --with pydantic --with orjson ${./mem0}/server.py'';
+
+  # Qdrant server to use instead of the embedded store under dataDir
+  qdrantRemote = svcCfg.qdrant.useService || svcCfg.qdrant.host != null;
+  qdrantEndpoint =
+    if svcCfg.qdrant.useService then
+      { inherit (config.services.qdrant) host port grpcPort; }
+    else
+      { inherit (svcCfg.qdrant) host port grpcPort; };
+  qdrantUnit = "${config.virtualisation.oci-containers.backend}-qdrant.service";
+
+  runtimeOption = lib.mkOption {
+    type = lib.types.enum [
+      "uv"
+      "nix"
+    ];
+    default = "uv";
+    description = ''
+      How to run the server: "uv" resolves mem0ai/mcp with `uv run` on every start,
+      "nix" uses a Python environment prebuilt from nixpkgs for fast restarts
+    '';
+  };
 in
 {
   options.programs.mem0 = {
@@ -42,6 +73,8 @@ in
       default = "$HOME/.local/share/mem0";
       description = "Directory for Mem0 local data storage (Qdrant)";
     };
+
+    runtime = runtimeOption;
   };
 
   options.services.mem0 = {
@@ -77,6 +110,218 @@ in
       description = "Open firewall port for Mem0 service";
     };
 
+    runtime = runtimeOption;
+
+    initMode = lib.mkOption {
+      type = lib.types.enum [
+        "eager"
+        "background"
+        "lazy"
+      ];
+      default = "background";
+      description = ''
+        When to build the mem0 backend: "eager" before serving, "background" in a
+        warm-up thread while the MCP endpoint is already up, "lazy" on the first tool call
+      '';
+    };
+
+    # Vector store connection (embedded store under dataDir unless a server is configured)
+    qdrant = {
+      useService = lib.mkOption {
+        type = lib.types.bool;
+        default = false;
+        description = "Connect to the local services.qdrant server (its host, HTTP and gRPC ports)";
+      };
+
+      host = lib.mkOption {
+        type = lib.types.nullOr lib.types.str;
+        default = null;
+        description = "Host of an external Qdrant server (ignored when useService is set)";
+      };
+
+      port = lib.mkOption {
+        type = lib.types.port;
+        default = 6333;
+        description = "HTTP port of the external Qdrant server";
+      };
+
+      grpcPort = lib.mkOption {
+        type = lib.types.port;
+        default = 6334;
+        description = "gRPC port of the external Qdrant server";
+      };
+
+      preferGrpc = lib.mkOption {
+        type = lib.types.bool;
+        default = true;
+        description = "Talk to the Qdrant server over gRPC (one persistent multiplexed channel) instead of HTTP";
+      };
+
+      timeout = lib.mkOption {
+        type = lib.types.ints.positive;
+        default = 10;
+        description = "Qdrant request timeout in seconds";
+      };
+    };
+
+    # Storage tuning for the mem0 collection (applied on a Qdrant server, migrated on start)
+    collection = {
+      quantization = lib.mkOption {
+        type = lib.types.enum [
+          "none"
+          "scalar"
+          "binary"
+        ];
+        default = "none";
+        description = ''
+          Vector quantization: "scalar" (int8, ~4x less RAM) or "binary" (~32x, best for
+          high-dimensional models such as text-embedding-3-large). Searches rescore with
+          the original vectors.
+        '';
+      };
+
+      onDiskVectors = lib.mkOption {
+        type = lib.types.bool;
+        default = false;
+        description = "Keep original vectors and the HNSW graph on disk (memory-mapped)";
+      };
+
+      onDiskPayload = lib.mkOption {
+        type = lib.types.bool;
+        default = false;
+        description = "Keep point payloads on disk instead of in RAM";
+      };
+
+      hnsw = {
+        m = lib.mkOption {
+          type = lib.types.nullOr lib.types.ints.positive;
+          default = null;
+          example = 16;
+          description = "HNSW edges per node (null keeps Qdrant's default)";
+        };
+
+        efConstruct = lib.mkOption {
+          type = lib.types.nullOr lib.types.ints.positive;
+          default = null;
+          example = 100;
+          description = "HNSW neighbours considered while building the index (null keeps Qdrant's default)";
+        };
+
+        ef = lib.mkOption {
+          type = lib.types.nullOr lib.types.ints.positive;
+          default = null;
+          example = 128;
+          description = "HNSW neighbours considered per search (null keeps Qdrant's default)";
+        };
+      };
+
+      indexUserId = lib.mkOption {
+        type = lib.types.bool;
+        default = true;
+        description = "Create a tenant keyword index on user_id for fast per-user filtered search";
+      };
+    };
+
+    workers = lib.mkOption {
+      type = lib.types.ints.positive;
+      default = 1;
+      description = ''
+        Server processes behind a local dispatcher on `port` (workers listen on port+1..port+N).
+        SSE sessions are routed by their user_id hint so each user's caches stay in one
+        process. More than one worker requires a Qdrant server (qdrant.useService or qdrant.host).
+      '';
+    };
+
+    # Worker pools for blocking Memory calls (kept separate so writes never delay reads)
+    concurrency = {
+      writeWorkers = lib.mkOption {
+        type = lib.types.ints.positive;
+        default = 2;
+        description = "Maximum concurrent write-path calls (add/update/delete, LLM-bound)";
+      };
+
+      readWorkers = lib.mkOption {
+        type = lib.types.ints.positive;
+        default = 8;
+        description = "Maximum concurrent read-path calls (search/get/history)";
+      };
+    };
+
+    # Background add_memory: a durable job queue under dataDir drained by job workers
+    asyncWrites = {
+      enable = lib.mkOption {
+        type = lib.types.bool;
+        default = false;
+        description = ''
+          Queue add_memory calls and return a job id right away instead of waiting for
+          LLM fact extraction (callers can still pass wait=true; poll get_job_status)
+        '';
+      };
+
+      workers = lib.mkOption {
+        type = lib.types.ints.unsigned;
+        default = 2;
+        description = "Job workers draining the queue (0 disables background writes entirely)";
+      };
+
+      maxPending = lib.mkOption {
+        type = lib.types.ints.positive;
+        default = 10000;
+        description = "Queued jobs before add_memory applies backpressure by running synchronously";
+      };
+
+      maxAttempts = lib.mkOption {
+        type = lib.types.ints.positive;
+        default = 5;
+        description = "Attempts per job (retried with exponential backoff) before it is marked failed";
+      };
+    };
+
+    responseFormat = lib.mkOption {
+      type = lib.types.enum [
+        "pretty"
+        "compact"
+        "jsonl"
+      ];
+      default = "pretty";
+      description = ''
+        Default tool response encoding (callers can override it per call): indented JSON,
+        compact JSON, or JSON lines split into chunks of 500 records for large listings
+      '';
+    };
+
+    metrics.enable = lib.mkEnableOption "Prometheus metrics at /metrics on the MCP server port";
+
+    # On-disk embedding cache (keyed by provider + model + text hash)
+    embeddingCache = {
+      enable = lib.mkOption {
+        type = lib.types.bool;
+        default = true;
+        description = "Cache embeddings under dataDir so repeated texts skip the embedder";
+      };
+
+      maxEntries = lib.mkOption {
+        type = lib.types.ints.positive;
+        default = 100000;
+        description = "Maximum cached vectors before least-recently-used entries are evicted";
+      };
+    };
+
+    # search_memories result cache, invalidated on every write for the affected user
+    searchCache = {
+      ttl = lib.mkOption {
+        type = lib.types.ints.unsigned;
+        default = 300;
+        description = "Seconds a cached search result may be served (0 disables the cache)";
+      };
+
+      maxEntries = lib.mkOption {
+        type = lib.types.ints.positive;
+        default = 10000;
+        description = "Maximum cached search results before least-recently-used ones are dropped";
+      };
+    };
+
     # Embedder configuration
     embedder = {
       provider = lib.mkOption {
@@ -154,13 +399,24 @@ in
           export MEM0_DATA_DIR="''${MEM0_DATA_DIR:-$HOME/.local/share/mem0}"
           export MEM0_DEFAULT_USER_ID="''${MEM0_DEFAULT_USER_ID:-${cfg.userId}}"
 
-          exec ${pkgs-unstable.uv}/bin/uv run --with mem0ai --with "mcp[cli]" --with pydantic ${./mem0/server.py} "$@"
+          exec ${serverCommand cfg.runtime} "$@"
         '')
       ];
     })
 
     # services.mem0 configuration (systemd service)
     (lib.mkIf svcCfg.enable {
+      assertions = [
+        {
+          assertion = !svcCfg.qdrant.useService || (config.services.qdrant.enable or false);
+          message = "services.mem0.qdrant.useService requires services.qdrant.enable";
+        }
+        {
+          assertion = svcCfg.workers == 1 || qdrantRemote;
+          message = "services.mem0.workers > 1 requires a Qdrant server (qdrant.useService or qdrant.host)";
+        }
+      ];
+
       # Dedicated service account for mem0
       users.users.mem0 = {
         isSystemUser = true;
@@ -182,7 +438,8 @@ in
       systemd.services.mem0 = {
         description = "Mem0 AI Memory MCP Server";
         wantedBy = [ "multi-user.target" ];
-        after = [ "network.target" ];
+        after = [ "network.target" ] ++ lib.optional svcCfg.qdrant.useService qdrantUnit;
+        wants = lib.optional svcCfg.qdrant.useService qdrantUnit;
 
         environment = {
           MEM0_DATA_DIR = svcCfg.dataDir;
@@ -192,9 +449,44 @@ in
           MEM0_EMBEDDER_MODEL = svcCfg.embedder.model;
           MEM0_LLM_PROVIDER = svcCfg.llm.provider;
           MEM0_LLM_MODEL = svcCfg.llm.model;
-          MEM0_QDRANT_PATH = "${svcCfg.dataDir}/qdrant";
+          MEM0_WRITE_WORKERS = toString svcCfg.concurrency.writeWorkers;
+          MEM0_READ_WORKERS = toString svcCfg.concurrency.readWorkers;
+          MEM0_INIT_MODE = svcCfg.initMode;
+          MEM0_ASYNC_WRITES = lib.boolToString svcCfg.asyncWrites.enable;
+          MEM0_JOB_WORKERS = toString svcCfg.asyncWrites.workers;
+          MEM0_JOB_MAX_PENDING = toString svcCfg.asyncWrites.maxPending;
+          MEM0_JOB_MAX_ATTEMPTS = toString svcCfg.asyncWrites.maxAttempts;
+          MEM0_RESPONSE_FORMAT = svcCfg.responseFormat;
+          MEM0_METRICS = lib.boolToString svcCfg.metrics.enable;
+          MEM0_EMBED_CACHE = lib.boolToString svcCfg.embeddingCache.enable;
+          MEM0_EMBED_CACHE_MAX_ENTRIES = toString svcCfg.embeddingCache.maxEntries;
+          MEM0_SEARCH_CACHE_TTL = toString svcCfg.searchCache.ttl;
+          MEM0_SEARCH_CACHE_MAX_ENTRIES = toString svcCfg.searchCache.maxEntries;
           MEM0_TELEMETRY = "false";
           ANONYMIZED_TELEMETRY = "false";
+        }
+        // lib.optionalAttrs qdrantRemote {
+          MEM0_QDRANT_HOST = qdrantEndpoint.host;
+          MEM0_QDRANT_PORT = toString qdrantEndpoint.port;
+          MEM0_QDRANT_GRPC_PORT = toString qdrantEndpoint.grpcPort;
+          MEM0_QDRANT_PREFER_GRPC = lib.boolToString svcCfg.qdrant.preferGrpc;
+          MEM0_QDRANT_TIMEOUT = toString svcCfg.qdrant.timeout;
+          MEM0_QDRANT_QUANTIZATION = svcCfg.collection.quantization;
+          MEM0_QDRANT_ON_DISK_VECTORS = lib.boolToString svcCfg.collection.onDiskVectors;
+          MEM0_QDRANT_ON_DISK_PAYLOAD = lib.boolToString svcCfg.collection.onDiskPayload;
+          MEM0_QDRANT_INDEX_USER_ID = lib.boolToString svcCfg.collection.indexUserId;
+        }
+        // lib.optionalAttrs (qdrantRemote && svcCfg.collection.hnsw.m != null) {
+          MEM0_QDRANT_HNSW_M = toString svcCfg.collection.hnsw.m;
+        }
+        // lib.optionalAttrs (qdrantRemote && svcCfg.collection.hnsw.efConstruct != null) {
+          MEM0_QDRANT_HNSW_EF_CONSTRUCT = toString svcCfg.collection.hnsw.efConstruct;
+        }
+        // lib.optionalAttrs (qdrantRemote && svcCfg.collection.hnsw.ef != null) {
+          MEM0_QDRANT_HNSW_EF = toString svcCfg.collection.hnsw.ef;
+        }
+        // lib.optionalAttrs (!qdrantRemote) {
+          MEM0_QDRANT_PATH = "${svcCfg.dataDir}/qdrant";
         };
 
         serviceConfig = {
@@ -252,6 +544,9 @@ in
                 "ANTHROPIC_API_KEY"
               else
                 "";
+            dispatchArgs = lib.optionalString (
+              svcCfg.workers > 1
+            ) "dispatch --workers ${toString svcCfg.workers} ";
           in
           ''
             ${lib.optionalString (svcCfg.embedder.apiKeyFile != null && embedderKeyEnv != "") ''
@@ -260,7 +555,7 @@ in
             ${lib.optionalString (svcCfg.llm.apiKeyFile != null && llmKeyEnv != "") ''
               export ${llmKeyEnv}="$(cat "${svcCfg.llm.apiKeyFile}")"
             ''}
-            exec ${pkgs-unstable.uv}/bin/uv run --with mem0ai --with "mcp[cli]" --with pydantic ${./mem0/server.py} --host ${svcCfg.host} --port ${toString svcCfg.port}
+            exec ${serverCommand svcCfg.runtime} ${dispatchArgs}--host ${svcCfg.host} --port ${toString svcCfg.port}
           '';
       };
 
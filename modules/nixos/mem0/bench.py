@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""Offline benchmark for the mem0 MCP server.
+
+Starts server.py against an embedded Qdrant store and a local stand-in for
+the OpenAI API (deterministic bag-of-words embeddings, an LLM that echoes
+input lines back as facts), then drives a mixed add/search/get_all workload
+from concurrent MCP SSE clients at growing collection sizes and reports
+ops/s, p50/p99 latency and server RSS.
+
+Usage:
+    uv run --with mem0ai --with "mcp[cli]" bench.py --quick
+    uv run --with mem0ai --with "mcp[cli]" bench.py --sizes 0,1000,10000 --clients 16
+"""
+
+import argparse
+import asyncio
+import collections
+import hashlib
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from mcp import ClientSession
+from mcp.client.sse import sse_client
+
+SERVER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "server.py")
+
+EMBEDDING_DIMS = 1536
+
+WORDS = (
+    "nix flake module overlay kernel laptop battery qdrant vector search agent "
+    "memory python rust haskell editor terminal fish shell git commit branch "
+    "deploy rebuild secret agenix systemd service socket podman container cosmic "
+    "wayland clipboard bluetooth wifi tailscale yubikey fingerprint tlp profile"
+).split()
+
+
+def embed_text(text: str, dims: int) -> list:
+    """Hash each word into a dimension so similar texts get similar vectors."""
+    vector = [0.0] * dims
+    for word in text.lower().split():
+        digest = hashlib.blake2b(word.encode(), digest_size=8).digest()
+        index = int.from_bytes(digest[:4], "little") % dims
+        vector[index] += 1.0 if digest[4] & 1 else -1.0
+    norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+    return [v / norm for v in vector]
+
+
+class FakeOpenAI(BaseHTTPRequestHandler):
+    """Just enough of /v1/embeddings and /v1/chat/completions for mem0."""
+
+    recent_facts = collections.deque(maxlen=512)
+    lock = threading.Lock()
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, body: dict) -> None:
+        data = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        if self.path.endswith("/embeddings"):
+            inputs = request["input"]
+            if isinstance(inputs, str):
+                inputs = [inputs]
+            dims = request.get("dimensions") or EMBEDDING_DIMS
+            self._reply(
+                {
+                    "object": "list",
+                    "model": request["model"],
+                    "data": [
+                        {
+                            "object": "embedding",
+                            "index": i,
+                            "embedding": embed_text(text, dims),
+                        }
+                        for i, text in enumerate(inputs)
+                    ],
+                    "usage": {"prompt_tokens": 0, "total_tokens": 0},
+                }
+            )
+        elif self.path.endswith("/chat/completions"):
+            self._reply(
+                {
+                    "id": "bench",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": request["model"],
+                    "choices": [
+                        {
+                            "index": 0,
+                            "message": {
+                                "role": "assistant",
+                                "content": json.dumps(self._complete(request)),
+                            },
+                            "finish_reason": "stop",
+                        }
+                    ],
+                    "usage": {
+                        "prompt_tokens": 0,
+                        "completion_tokens": 0,
+                        "total_tokens": 0,
+                    },
+                }
+            )
+        else:
+            self.send_error(404)
+
+    def _complete(self, request: dict) -> dict:
+        prompt = "\n".join(str(m.get("content", "")) for m in request["messages"])
+        # Fact extraction gets the conversation as "user: ..." lines
+        facts = [
+            line.split(":", 1)[1].strip()
+            for line in prompt.splitlines()
+            if line.startswith("user:")
+        ]
+        if facts:
+            with self.lock:
+                self.recent_facts.extend(facts)
+            return {"facts": facts}
+        # Memory update step: add every fact we extracted that the prompt mentions
+        with self.lock:
+            facts = [fact for fact in self.recent_facts if fact in prompt]
+        return {
+            "memory": [
+                {"id": str(i), "text": fact, "event": "ADD"}
+                for i, fact in enumerate(dict.fromkeys(facts))
+            ]
+        }
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def rss_mb(pid: int) -> float:
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def percentile(values: list, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def sentence(rng: random.Random, words: int = 8) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def tool_args(op: str, rng: random.Random) -> dict:
+    if op == "add":
+        return {"content": f"{sentence(rng)} {rng.getrandbits(32):x}"}
+    if op == "search":
+        return {"query": sentence(rng, 3), "limit": 10}
+    return {"limit": 100}
+
+
+TOOLS = {
+    "add": "add_memory",
+    "search": "search_memories",
+    "get_all": "get_all_memories",
+}
+
+
+async def call(session: ClientSession, tool: str, args: dict) -> None:
+    result = await session.call_tool(tool, args)
+    if result.isError:
+        raise RuntimeError(result.content[0].text if result.content else tool)
+
+
+async def preload(url: str, target: int, current: int, rng: random.Random) -> int:
+    """Grow the collection to target memories with verbatim bulk adds."""
+    async with sse_client(url) as streams, ClientSession(*streams) as session:
+        await session.initialize()
+        while current < target:
+            n = min(500, target - current)
+            items = [f"{sentence(rng)} {rng.getrandbits(32):x}" for _ in range(n)]
+            await call(
+                session, "add_memories", {"items": json.dumps(items), "infer": False}
+            )
+            current += n
+    return current
+
+
+async def client_loop(
+    url: str, ops: list, deadline: float, seed: int, latencies: dict, errors: dict
+) -> None:
+    rng = random.Random(seed)
+    async with sse_client(url) as streams, ClientSession(*streams) as session:
+        await session.initialize()
+        while time.monotonic() < deadline:
+            op = rng.choice(ops)
+            started = time.perf_counter()
+            try:
+                await call(session, TOOLS[op], tool_args(op, rng))
+            except Exception:
+                errors[op] += 1
+                continue
+            latencies[op].append(time.perf_counter() - started)
+
+
+async def run_stage(url: str, args, ops: list) -> tuple:
+    latencies = collections.defaultdict(list)
+    errors = collections.Counter()
+    deadline = time.monotonic() + args.duration
+    started = time.monotonic()
+    await asyncio.gather(
+        *(
+            client_loop(url, ops, deadline, args.seed + i, latencies, errors)
+            for i in range(args.clients)
+        )
+    )
+    return latencies, errors, time.monotonic() - started
+
+
+def parse_mix(mix: str) -> list:
+    ops = []
+    for part in mix.split(","):
+        op, weight = part.split("=")
+        if op not in TOOLS:
+            raise ValueError(f"Unknown op {op!r}; valid: {', '.join(TOOLS)}")
+        ops.extend([op] * int(weight))
+    return ops
+
+
+def start_server(workdir: str, fake_url: str, port: int, extra_env: list):
+    env = dict(
+        os.environ,
+        MEM0_DATA_DIR=workdir,
+        MEM0_QDRANT_PATH=os.path.join(workdir, "qdrant"),
+        MEM0_EMBEDDER_PROVIDER="openai",
+        MEM0_EMBEDDER_MODEL="text-embedding-3-small",
+        MEM0_LLM_PROVIDER="openai",
+        MEM0_LLM_MODEL="gpt-4o-mini",
+        MEM0_INIT_MODE="eager",
+        MEM0_DEFAULT_USER_ID="bench",
+        OPENAI_API_KEY="bench",
+        OPENAI_BASE_URL=fake_url,
+        OPENAI_API_BASE=fake_url,
+        HOME=workdir,
+    )
+    for item in extra_env:
+        key, value = item.split("=", 1)
+        env[key] = value
+    proc = subprocess.Popen(
+        [sys.executable, SERVER, "--host", "127.0.0.1", "--port", str(port)],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=open(os.path.join(workdir, "server.log"), "w"),
+    )
+    deadline = time.monotonic() + 120
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"server exited, see {workdir}/server.log")
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return proc
+        except OSError:
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError("server did not start within 120s")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", default="0,1000,5000", help="Collection sizes")
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=20, help="Seconds per size")
+    parser.add_argument("--mix", default="add=1,search=8,get_all=1")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument(
+        "--env", action="append", default=[], help="Extra server env, KEY=VALUE"
+    )
+    parser.add_argument("--json", action="store_true", help="Print JSON results")
+    parser.add_argument(
+        "--max-p99-ms", type=float, help="Exit non-zero if any op's p99 exceeds this"
+    )
+    parser.add_argument(
+        "--quick", action="store_true", help="Small CI run (sizes 0,500; 5s; 4 clients)"
+    )
+    args = parser.parse_args()
+    if args.quick:
+        args.sizes, args.duration, args.clients = "0,500", 5, 4
+    sizes = [int(size) for size in args.sizes.split(",")]
+    ops = parse_mix(args.mix)
+
+    fake = ThreadingHTTPServer(("127.0.0.1", 0), FakeOpenAI)
+    threading.Thread(target=fake.serve_forever, daemon=True).start()
+    fake_url = f"http://127.0.0.1:{fake.server_address[1]}/v1"
+
+    results = []
+    failed = False
+    with tempfile.TemporaryDirectory(prefix="mem0-bench-") as workdir:
+        port = free_port()
+        url = f"http://127.0.0.1:{port}/sse"
+        proc = start_server(workdir, fake_url, port, args.env)
+        try:
+            rng = random.Random(args.seed)
+            size = 0
+            for target in sizes:
+                size = asyncio.run(preload(url, target, size, rng))
+                latencies, errors, elapsed = asyncio.run(run_stage(url, args, ops))
+                rss = rss_mb(proc.pid)
+                for op in TOOLS:
+                    samples = latencies.get(op, [])
+                    if not samples and not errors[op]:
+                        continue
+                    row = {
+                        "size": target,
+                        "op": op,
+                        "count": len(samples),
+                        "errors": errors[op],
+                        "ops_per_s": round(len(samples) / elapsed, 1),
+                        "p50_ms": round(percentile(samples, 50) * 1000, 2),
+                        "p99_ms": round(percentile(samples, 99) * 1000, 2),
+                        "rss_mb": round(rss, 1),
+                    }
+                    results.append(row)
+                    if errors[op] or (
+                        args.max_p99_ms is not None and row["p99_ms"] > args.max_p99_ms
+                    ):
+                        failed = True
+                # adds during the stage grew the collection too
+                size = target + len(latencies.get("add", []))
+        finally:
+            proc.terminate()
+            proc.wait(timeout=30)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        header = (
+            f"{'size':>8} {'op':<8} {'count':>7} {'err':>4} {'ops/s':>8} "
+            f"{'p50 ms':>8} {'p99 ms':>8} {'rss MB':>8}"
+        )
+        print(header)
+        print("-" * len(header))
+        for r in results:
+            print(
+                f"{r['size']:>8} {r['op']:<8} {r['count']:>7} {r['errors']:>4} "
+                f"{r['ops_per_s']:>8} {r['p50_ms']:>8} {r['p99_ms']:>8} "
+                f"{r['rss_mb']:>8}"
+            )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
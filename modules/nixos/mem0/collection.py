@@ -0,0 +1,148 @@
+"""Storage tuning for the mem0 Qdrant collection.
+
+mem0 creates the collection with only a vector size, so quantization,
+on-disk storage, HNSW parameters and payload indexes are applied here right
+after it exists. Settings are diffed against the live collection config and
+only changed ones are sent, which makes the same call a migration for
+collections created by older versions.
+"""
+
+import logging
+from typing import Optional
+
+logger = logging.getLogger("mem0-mcp")
+
+QUANTIZATION_MODES = ("none", "scalar", "binary")
+
+# Candidates fetched per result before rescoring with full vectors
+BINARY_OVERSAMPLING = 3.0
+
+
+def _quantization_config(models, mode: str):
+    if mode == "scalar":
+        return models.ScalarQuantization(
+            scalar=models.ScalarQuantizationConfig(
+                type=models.ScalarType.INT8, quantile=0.99, always_ram=True
+            )
+        )
+    if mode == "binary":
+        return models.BinaryQuantization(
+            binary=models.BinaryQuantizationConfig(always_ram=True)
+        )
+    return models.Disabled.DISABLED
+
+
+def _current_quantization(config) -> str:
+    quantization = config.quantization_config
+    if quantization is None:
+        return "none"
+    if getattr(quantization, "scalar", None) is not None:
+        return "scalar"
+    if getattr(quantization, "binary", None) is not None:
+        return "binary"
+    return "other"
+
+
+def apply_settings(
+    client,
+    collection_name: str,
+    quantization: str = "none",
+    on_disk_vectors: bool = False,
+    on_disk_payload: bool = False,
+    hnsw_m: Optional[int] = None,
+    hnsw_ef_construct: Optional[int] = None,
+    index_user_id: bool = True,
+) -> None:
+    """Bring the collection's storage settings in line with the given ones."""
+    from qdrant_client import models
+
+    if quantization not in QUANTIZATION_MODES:
+        raise ValueError(f"Unknown quantization {quantization!r}")
+
+    config = client.get_collection(collection_name).config
+    vectors = config.params.vectors
+    # mem0 uses a single unnamed vector; named configs come back as a dict
+    if isinstance(vectors, dict):
+        vectors = vectors.get("")
+
+    changes = {}
+    if vectors is not None and bool(vectors.on_disk) != on_disk_vectors:
+        changes["vectors_config"] = {
+            "": models.VectorParamsDiff(on_disk=on_disk_vectors)
+        }
+    if bool(config.params.on_disk_payload) != on_disk_payload:
+        changes["collection_params"] = models.CollectionParamsDiff(
+            on_disk_payload=on_disk_payload
+        )
+
+    hnsw = {}
+    if hnsw_m is not None and config.hnsw_config.m != hnsw_m:
+        hnsw["m"] = hnsw_m
+    if hnsw_ef_construct is not None and (
+        config.hnsw_config.ef_construct != hnsw_ef_construct
+    ):
+        hnsw["ef_construct"] = hnsw_ef_construct
+    if bool(config.hnsw_config.on_disk) != on_disk_vectors:
+        hnsw["on_disk"] = on_disk_vectors
+    if hnsw:
+        changes["hnsw_config"] = models.HnswConfigDiff(**hnsw)
+
+    if _current_quantization(config) != quantization:
+        changes["quantization_config"] = _quantization_config(models, quantization)
+
+    if changes:
+        logger.info(
+            f"Updating collection {collection_name}: {', '.join(sorted(changes))}"
+        )
+        client.update_collection(collection_name=collection_name, **changes)
+
+    if index_user_id:
+        schema = client.get_collection(collection_name).payload_schema or {}
+        if "user_id" not in schema:
+            logger.info(f"Creating user_id payload index on {collection_name}")
+            # is_tenant co-locates each user's points for fast filtered search
+            client.create_payload_index(
+                collection_name=collection_name,
+                field_name="user_id",
+                field_schema=models.KeywordIndexParams(
+                    type=models.KeywordIndexType.KEYWORD, is_tenant=True
+                ),
+            )
+
+
+def search_params(quantization: str = "none", hnsw_ef: Optional[int] = None):
+    """Build query-time search params, or None if defaults are fine."""
+    from qdrant_client import models
+
+    if quantization == "none" and hnsw_ef is None:
+        return None
+    quantization_params = None
+    if quantization != "none":
+        quantization_params = models.QuantizationSearchParams(
+            rescore=True,
+            oversampling=BINARY_OVERSAMPLING if quantization == "binary" else None,
+        )
+    return models.SearchParams(hnsw_ef=hnsw_ef, quantization=quantization_params)
+
+
+def install_search_params(vector_store, params) -> None:
+    """Make mem0's vector_store.search pass Qdrant search params.
+
+    mem0's Qdrant.search has no hook for hnsw_ef or rescoring, so this
+    replaces it on the instance with the same query plus the params.
+    """
+    if params is None:
+        return
+
+    def search(query, vectors, limit=5, filters=None):
+        query_filter = vector_store._create_filter(filters) if filters else None
+        hits = vector_store.client.query_points(
+            collection_name=vector_store.collection_name,
+            query=vectors,
+            query_filter=query_filter,
+            limit=limit,
+            search_params=params,
+        )
+        return hits.points
+
+    vector_store.search = search
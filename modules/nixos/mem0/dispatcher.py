@@ -0,0 +1,218 @@
+"""Spread MCP SSE sessions over several mem0 server processes.
+
+Each worker is a full server.py process on its own local port, so users
+stop sharing one interpreter and GIL. The dispatcher is a small HTTP
+reverse proxy in front of them:
+
+- GET /sse picks a worker by crc32 of the user hint (a user_id query
+  parameter or X-Mem0-User-Id header), so a user's sessions land on the
+  same worker and find its caches warm; sessions without a hint are
+  spread round-robin.
+- GET /metrics always goes to worker 0 (or ?worker=N), so successive
+  scrapes read the same process's counters.
+- The session_id a worker announces in its endpoint event is remembered,
+  so the POST /messages/?session_id=... calls of that session reach the
+  worker that owns it.
+
+Every proxied connection carries a single request (Connection: close),
+which keeps the proxy a plain byte pipe.
+"""
+
+import argparse
+import asyncio
+import itertools
+import logging
+import re
+import signal
+import sys
+import zlib
+from typing import Optional
+from urllib.parse import parse_qs, urlsplit
+
+logger = logging.getLogger("mem0-mcp")
+
+USER_HEADER = "x-mem0-user-id"
+SESSION_RE = re.compile(rb"session_id=([0-9a-fA-F-]+)")
+
+# Bytes of an SSE response searched for the endpoint event's session_id
+SNIFF_BYTES = 4096
+
+# How long a request waits for its worker to accept connections (startup)
+CONNECT_TIMEOUT = 30
+
+
+class Dispatcher:
+    def __init__(self, ports: list):
+        self.ports = ports
+        self.sessions = {}
+        self._round_robin = itertools.count()
+
+    def route(self, path: str, query: dict, headers: dict) -> int:
+        """Pick the worker index for a request."""
+        if path.rstrip("/") == "/metrics":
+            worker = query.get("worker", ["0"])[0]
+            if worker.isdigit() and int(worker) < len(self.ports):
+                return int(worker)
+            return 0
+        session = query.get("session_id", [None])[0]
+        if session in self.sessions:
+            return self.sessions[session]
+        user = query.get("user_id", [None])[0] or headers.get(USER_HEADER)
+        if user:
+            return zlib.crc32(user.encode()) % len(self.ports)
+        return next(self._round_robin) % len(self.ports)
+
+    async def connect(self, index: int):
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + CONNECT_TIMEOUT
+        while True:
+            try:
+                return await asyncio.open_connection("127.0.0.1", self.ports[index])
+            except OSError:
+                if loop.time() > deadline:
+                    raise
+                await asyncio.sleep(0.2)
+
+    async def handle(self, reader, writer) -> None:
+        try:
+            await self.proxy(reader, writer)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def proxy(self, reader, writer) -> None:
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            return
+        try:
+            method, target, headers, forwarded = parse_head(head)
+        except ValueError:
+            writer.write(b"HTTP/1.1 400 Bad Request\r\nConnection: close\r\n\r\n")
+            await writer.drain()
+            return
+
+        url = urlsplit(target)
+        index = self.route(url.path, parse_qs(url.query), headers)
+        try:
+            up_reader, up_writer = await self.connect(index)
+        except OSError as e:
+            logger.warning(f"Worker {index} unreachable: {e}")
+            writer.write(b"HTTP/1.1 502 Bad Gateway\r\nConnection: close\r\n\r\n")
+            await writer.drain()
+            return
+
+        up_writer.write(("\r\n".join(forwarded) + "\r\n\r\n").encode("latin-1"))
+        request_body = asyncio.ensure_future(pipe(reader, up_writer))
+        sniff = method == "GET" and url.path.rstrip("/").endswith("/sse")
+        try:
+            await self.relay_response(up_reader, writer, index, sniff)
+        finally:
+            request_body.cancel()
+            up_writer.close()
+
+    async def relay_response(self, up_reader, writer, index: int, sniff: bool):
+        """Copy a worker's response to the client, tracking SSE sessions."""
+        session: Optional[str] = None
+        seen = b""
+        try:
+            while data := await up_reader.read(65536):
+                if sniff and session is None and len(seen) < SNIFF_BYTES:
+                    seen += data
+                    match = SESSION_RE.search(seen)
+                    if match:
+                        session = match.group(1).decode()
+                        self.sessions[session] = index
+                writer.write(data)
+                await writer.drain()
+        finally:
+            if session is not None:
+                self.sessions.pop(session, None)
+
+
+def parse_head(head: bytes) -> tuple:
+    """Split a request head into (method, target, headers, forwarded lines).
+
+    Raises ValueError for a malformed request line.
+    """
+    lines = head.decode("latin-1").split("\r\n")
+    method, target, _ = lines[0].split(" ", 2)
+    headers = {}
+    forwarded = [lines[0]]
+    for line in lines[1:]:
+        if not line:
+            continue
+        name, _, value = line.partition(":")
+        name = name.strip().lower()
+        headers[name] = value.strip()
+        if name not in ("connection", "keep-alive"):
+            forwarded.append(line)
+    forwarded.append("Connection: close")
+    return method, target, headers, forwarded
+
+
+async def pipe(reader, writer) -> None:
+    """Copy bytes until EOF, then half-close the destination."""
+    try:
+        while data := await reader.read(65536):
+            writer.write(data)
+            await writer.drain()
+        if writer.can_write_eof():
+            writer.write_eof()
+    except ConnectionError:
+        pass
+
+
+async def serve(server_path: str, host: str, port: int, workers: int) -> int:
+    """Run worker processes on port+1..port+workers behind the dispatcher."""
+    ports = [port + i + 1 for i in range(workers)]
+    procs = [
+        await asyncio.create_subprocess_exec(
+            sys.executable, server_path, "--host", "127.0.0.1", "--port", str(p)
+        )
+        for p in ports
+    ]
+    dispatcher = Dispatcher(ports)
+    server = await asyncio.start_server(dispatcher.handle, host, port)
+    logger.info(
+        f"Dispatching {host}:{port} over {workers} workers on ports "
+        f"{ports[0]}-{ports[-1]}"
+    )
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+    stopped = asyncio.ensure_future(stop.wait())
+    exited = [asyncio.ensure_future(proc.wait()) for proc in procs]
+    done, _ = await asyncio.wait([stopped, *exited], return_when="FIRST_COMPLETED")
+
+    # A dead worker would strand its users, so exit and let systemd restart us
+    status = 0 if stopped in done else 1
+    if status:
+        logger.error("A worker exited; shutting down")
+    server.close()
+    for proc in procs:
+        if proc.returncode is None:
+            proc.terminate()
+    await asyncio.gather(*(proc.wait() for proc in procs))
+    return status
+
+
+def run_cli(argv: list, server_path: str, qdrant_path: Optional[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog="server.py dispatch",
+        description="Serve MCP over SSE from several worker processes",
+    )
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8050)
+    args = parser.parse_args(argv)
+
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.workers > 1 and qdrant_path:
+        # Embedded Qdrant locks its directory to a single process
+        parser.error("multiple workers need a Qdrant server (MEM0_QDRANT_HOST)")
+    return asyncio.run(serve(server_path, args.host, args.port, args.workers))
@@ -0,0 +1,196 @@
+"""Content-addressed on-disk cache for mem0 embeddings.
+
+Vectors are stored in SQLite keyed by sha256(provider, model, action, text),
+so repeated queries and re-added content skip the embedder round-trip.
+"""
+
+import array
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+logger = logging.getLogger("mem0-mcp")
+
+# How many inserts between eviction passes (keeps COUNT(*) off the hot path)
+EVICT_EVERY = 256
+
+# Inputs per request for providers with a batch embeddings API
+EMBED_BATCH_SIZE = 64
+
+
+class EmbeddingCache:
+    """SQLite-backed LRU cache of embedding vectors."""
+
+    def __init__(self, path: str, max_entries: int = 100_000):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._inserts = 0
+        self._lock = threading.Lock()
+
+        self._conn = sqlite3.connect(
+            path, timeout=30, check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " key TEXT PRIMARY KEY,"
+            " vector BLOB NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS embeddings_last_used"
+            " ON embeddings (last_used)"
+        )
+
+    @staticmethod
+    def make_key(
+        provider: str, model: str, text: str, action: Optional[str] = None
+    ) -> str:
+        """Hash everything that affects the vector into a cache key."""
+        digest = hashlib.sha256()
+        for part in (provider, model, action or "", text):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[list]:
+        """Return the cached vector for key, or None on a miss."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT vector FROM embeddings WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._conn.execute(
+                "UPDATE embeddings SET last_used = ? WHERE key = ?",
+                (time.time(), key),
+            )
+        return array.array("f", row[0]).tolist()
+
+    def put(self, key: str, vector: list) -> None:
+        """Store a vector, evicting least-recently-used entries when full."""
+        blob = array.array("f", vector).tobytes()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO embeddings (key, vector, last_used)"
+                " VALUES (?, ?, ?)",
+                (key, blob, time.time()),
+            )
+            self._inserts += 1
+            if self._inserts % EVICT_EVERY == 0:
+                self._evict()
+
+    def _evict(self) -> None:
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+        excess = count - self.max_entries
+        if excess <= 0:
+            return
+        # Trim a little below the limit so we don't evict on every pass
+        excess += self.max_entries // 10
+        self._conn.execute(
+            "DELETE FROM embeddings WHERE key IN ("
+            " SELECT key FROM embeddings ORDER BY last_used LIMIT ?)",
+            (excess,),
+        )
+        self.evictions += excess
+        logger.info(f"Embedding cache evicted {excess} entries")
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and current size."""
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "entries": count,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+def batch_embed(embedder, provider: str, texts: list, memory_action=None) -> list:
+    """Embed texts with as few requests as the provider allows.
+
+    OpenAI accepts a list of inputs per request; other providers fall back
+    to one embed() call per text.
+    """
+    if provider == "openai" and hasattr(embedder, "client"):
+        vectors = []
+        for start in range(0, len(texts), EMBED_BATCH_SIZE):
+            chunk = texts[start : start + EMBED_BATCH_SIZE]
+            response = embedder.client.embeddings.create(
+                input=[text.replace("\n", " ") for text in chunk],
+                model=embedder.config.model,
+                dimensions=embedder.config.embedding_dims,
+            )
+            vectors.extend(item.embedding for item in response.data)
+        return vectors
+    if memory_action is None:
+        return [embedder.embed(text) for text in texts]
+    return [embedder.embed(text, memory_action) for text in texts]
+
+
+def embed_many(embedder, provider: str, texts: list, memory_action=None) -> list:
+    """Embed a batch of texts, going through the cache when one is installed."""
+    # Duck-typed so wrappers around a CachedEmbedder still hit the cache
+    if hasattr(embedder, "embed_many"):
+        return embedder.embed_many(texts, memory_action)
+    return batch_embed(embedder, provider, texts, memory_action)
+
+
+class CachedEmbedder:
+    """Wraps a mem0 embedder and serves repeated texts from an EmbeddingCache.
+
+    Every attribute other than embed() is delegated to the wrapped embedder,
+    so mem0 keeps seeing its own config and client objects.
+    """
+
+    def __init__(self, inner, cache: EmbeddingCache, provider: str, model: str):
+        self._inner = inner
+        self.cache = cache
+        self.provider = provider
+        self.model = model
+
+    def embed(self, text, memory_action=None):
+        key = self.cache.make_key(self.provider, self.model, text, memory_action)
+        vector = self.cache.get(key)
+        if vector is None:
+            if memory_action is None:
+                vector = self._inner.embed(text)
+            else:
+                vector = self._inner.embed(text, memory_action)
+            self.cache.put(key, vector)
+        return vector
+
+    def embed_many(self, texts: list, memory_action=None) -> list:
+        keys = [
+            self.cache.make_key(self.provider, self.model, text, memory_action)
+            for text in texts
+        ]
+        vectors = [self.cache.get(key) for key in keys]
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            computed = batch_embed(
+                self._inner,
+                self.provider,
+                [texts[i] for i in missing],
+                memory_action,
+            )
+            for i, vector in zip(missing, computed):
+                self.cache.put(keys[i], vector)
+                vectors[i] = vector
+        return vectors
+
+    def __getattr__(self, name):
+        return getattr(self._inner, name)
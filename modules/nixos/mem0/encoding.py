@@ -0,0 +1,87 @@
+"""Response encodings for mem0 tool results.
+
+pretty is indented JSON (the original output), compact drops all
+whitespace, and jsonl returns one record per line split into several
+text chunks, so large listings reach the client as a sequence of content
+blocks rather than one huge string. orjson is used when it is installed.
+"""
+
+import json
+from typing import Optional, Union
+
+# Shared with get_all's projection, next to the record fields it validates
+from pagination import parse_fields
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+FORMATS = ("pretty", "compact", "jsonl")
+
+# Records per text chunk in jsonl responses
+CHUNK_RECORDS = 500
+
+
+def dumps(obj, pretty: bool = False) -> str:
+    if orjson is not None:
+        option = orjson.OPT_INDENT_2 if pretty else 0
+        return orjson.dumps(obj, default=str, option=option).decode()
+    if pretty:
+        return json.dumps(obj, indent=2, default=str)
+    return json.dumps(obj, separators=(",", ":"), default=str)
+
+
+def _split(result) -> tuple:
+    """Return (records, envelope): the record list and the keys around it."""
+    if isinstance(result, list):
+        return result, {}
+    if isinstance(result, dict) and isinstance(result.get("results"), list):
+        envelope = {k: v for k, v in result.items() if k != "results"}
+        return result["results"], envelope
+    return None, result
+
+
+def project(result, fields: Optional[list]):
+    """Keep only the given keys on every record of a result."""
+    if not fields:
+        return result
+    records, envelope = _split(result)
+    if records is None:
+        return result
+    trimmed = [
+        {k: record[k] for k in fields if k in record}
+        if isinstance(record, dict)
+        else record
+        for record in records
+    ]
+    if isinstance(result, list):
+        return trimmed
+    return {**envelope, "results": trimmed}
+
+
+def check_format(fmt: str) -> str:
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format {fmt!r}; valid: {', '.join(FORMATS)}")
+    return fmt
+
+
+def encode(result, fmt: str = "pretty") -> Union[str, list]:
+    """Serialize a tool result; jsonl returns a list of text chunks.
+
+    The first jsonl line holds whatever surrounds the record list (e.g.
+    next_cursor), if anything.
+    """
+    check_format(fmt)
+    if fmt != "jsonl":
+        return dumps(result, pretty=fmt == "pretty")
+    records, envelope = _split(result)
+    if records is None:
+        return dumps(result)
+    lines = [dumps(envelope)] if envelope else []
+    lines.extend(dumps(record) for record in records)
+    chunks = [
+        "\n".join(lines[start : start + CHUNK_RECORDS])
+        for start in range(0, len(lines), CHUNK_RECORDS)
+    ]
+    return chunks or [""]
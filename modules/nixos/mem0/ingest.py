@@ -0,0 +1,222 @@
+"""Batched bulk ingest for mem0.
+
+Shared by the add_memories MCP tool and the `mem0-mcp-server ingest` CLI.
+
+With inference on, items for the same user and metadata are grouped so one
+LLM extraction prompt covers several items. With inference off, content is
+stored verbatim: embeddings are requested in batches and all points of a
+batch go to Qdrant in a single upsert.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import time
+import uuid
+from concurrent.futures import Executor
+from datetime import datetime, timezone
+
+from embedding_cache import embed_many
+
+logger = logging.getLogger("mem0-mcp")
+
+# Items per LLM extraction prompt when inference is on
+DEFAULT_GROUP_SIZE = 5
+
+# Lines per CLI batch (a checkpoint is written after each batch)
+DEFAULT_BATCH_SIZE = 100
+
+
+def normalize_items(raw_items: list, default_user_id: str) -> list:
+    """Validate raw items and fill in user_id defaults."""
+    items = []
+    for i, raw in enumerate(raw_items):
+        if isinstance(raw, str):
+            raw = {"content": raw}
+        if not isinstance(raw, dict) or not raw.get("content"):
+            raise ValueError(f"Item {i} has no content")
+        metadata = raw.get("metadata")
+        if isinstance(metadata, str):
+            metadata = json.loads(metadata)
+        items.append(
+            {
+                "content": str(raw["content"]),
+                "user_id": raw.get("user_id") or default_user_id,
+                "metadata": metadata or None,
+            }
+        )
+    return items
+
+
+def group_items(items: list, group_size: int, infer: bool) -> list:
+    """Split items into groups that can each be written with one Memory call.
+
+    Verbatim writes carry per-item payloads, so the whole list is one group.
+    Inferred writes share user_id and metadata across a prompt, so only
+    consecutive items with matching values are grouped.
+    """
+    if not infer:
+        return [items] if items else []
+
+    groups = []
+    current = []
+    current_key = None
+    for item in items:
+        key = (item["user_id"], json.dumps(item["metadata"], sort_keys=True))
+        if current and (key != current_key or len(current) >= group_size):
+            groups.append(current)
+            current = []
+        current.append(item)
+        current_key = key
+    if current:
+        groups.append(current)
+    return groups
+
+
+def store_verbatim(memory, items: list, provider: str) -> list:
+    """Embed items in batches and upsert them without LLM extraction."""
+    texts = [item["content"] for item in items]
+    vectors = embed_many(memory.embedding_model, provider, texts, "add")
+
+    now = datetime.now(timezone.utc).isoformat()
+    ids = [str(uuid.uuid4()) for _ in items]
+    payloads = []
+    for item in items:
+        payload = dict(item["metadata"] or {})
+        payload.update(
+            data=item["content"],
+            hash=hashlib.md5(item["content"].encode()).hexdigest(),
+            created_at=now,
+            user_id=item["user_id"],
+        )
+        payloads.append(payload)
+
+    memory.vector_store.insert(vectors=vectors, payloads=payloads, ids=ids)
+    for memory_id, item in zip(ids, items):
+        memory.db.add_history(memory_id, None, item["content"], "ADD", created_at=now)
+
+    return [
+        {"id": memory_id, "memory": item["content"], "event": "ADD"}
+        for memory_id, item in zip(ids, items)
+    ]
+
+
+def ingest_group(memory, group: list, infer: bool, provider: str) -> list:
+    """Write one group and return the resulting memory events."""
+    if not infer:
+        return store_verbatim(memory, group, provider)
+
+    messages = [{"role": "user", "content": item["content"]} for item in group]
+    result = memory.add(
+        messages, user_id=group[0]["user_id"], metadata=group[0]["metadata"]
+    )
+    return result.get("results", []) if isinstance(result, dict) else result
+
+
+def read_checkpoint(path: str) -> int:
+    """Return the number of input lines already ingested."""
+    try:
+        with open(path) as f:
+            return int(json.load(f)["line"])
+    except FileNotFoundError:
+        return 0
+
+
+def write_checkpoint(path: str, line: int) -> None:
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump({"line": line, "updated_at": time.time()}, f)
+    os.replace(tmp, path)
+
+
+def run_cli(
+    memory,
+    argv: list,
+    default_user_id: str,
+    provider: str,
+    pool: Executor,
+) -> int:
+    """Entry point for `mem0-mcp-server ingest FILE.jsonl`.
+
+    Each JSONL line is either a string or an object with `content` and
+    optional `user_id` / `metadata`. Progress is checkpointed after every
+    batch, so an interrupted import resumes where it stopped.
+    """
+    parser = argparse.ArgumentParser(
+        prog="mem0-mcp-server ingest", description="Bulk import memories from JSONL"
+    )
+    parser.add_argument("file", help="JSONL file to import")
+    parser.add_argument("--user-id", default=default_user_id)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--group-size", type=int, default=DEFAULT_GROUP_SIZE)
+    parser.add_argument(
+        "--no-infer",
+        dest="infer",
+        action="store_false",
+        help="Store content verbatim (no LLM extraction, bulk embed + upsert)",
+    )
+    parser.add_argument(
+        "--checkpoint", help="Checkpoint file (default: FILE.checkpoint)"
+    )
+    parser.add_argument(
+        "--restart", action="store_true", help="Ignore an existing checkpoint"
+    )
+    args = parser.parse_args(argv)
+
+    checkpoint = args.checkpoint or f"{args.file}.checkpoint"
+    start_line = 0 if args.restart else read_checkpoint(checkpoint)
+
+    with open(args.file) as f:
+        total = sum(1 for _ in f)
+    if start_line:
+        logger.info(f"Resuming {args.file} at line {start_line}/{total}")
+
+    started = time.monotonic()
+    written = 0
+    skipped = 0
+
+    def flush(batch: list, line: int) -> None:
+        nonlocal written
+        groups = group_items(batch, args.group_size, args.infer)
+        futures = [
+            pool.submit(ingest_group, memory, group, args.infer, provider)
+            for group in groups
+        ]
+        for future in futures:
+            future.result()
+        written += len(batch)
+        write_checkpoint(checkpoint, line)
+        rate = written / max(time.monotonic() - started, 1e-9)
+        eta = (total - line) / rate if rate else 0
+        logger.info(
+            f"Ingested {line}/{total} lines ({written} items, {rate:.1f}/s, "
+            f"ETA {eta:.0f}s)"
+        )
+
+    batch = []
+    line = 0
+    with open(args.file) as f:
+        for line, text in enumerate(f, start=1):
+            if line <= start_line or not text.strip():
+                continue
+            try:
+                batch.extend(normalize_items([json.loads(text)], args.user_id))
+            except ValueError as e:
+                skipped += 1
+                logger.warning(f"Skipping line {line}: {e}")
+                continue
+            if len(batch) >= args.batch_size:
+                flush(batch, line)
+                batch = []
+    if batch:
+        flush(batch, line)
+
+    if os.path.exists(checkpoint):
+        os.remove(checkpoint)
+    logger.info(
+        f"Ingest complete: {written} items in {time.monotonic() - started:.1f}s"
+        f" ({skipped} lines skipped)"
+    )
+    return 0
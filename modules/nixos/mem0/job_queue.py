@@ -0,0 +1,300 @@
+"""Durable queue for add_memory calls that run in the background.
+
+Jobs live in SQLite under the data directory, so queued writes survive
+restarts. A job is claimed inside a write transaction and leased to the
+claiming worker, which renews the lease while the job runs; if that process
+dies, the lease expires and any worker (in this or another server process)
+picks it up again. Only the current lease holder can finish a job. Failed
+jobs are retried with exponential backoff up to a fixed number of attempts.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Callable, Optional
+
+logger = logging.getLogger("mem0-mcp")
+
+# Backoff between attempts: RETRY_BASE * 2^(attempt - 1), capped
+RETRY_BASE = 2.0
+RETRY_MAX = 300.0
+
+# How often idle workers look for jobs enqueued by other processes or due retries
+POLL_INTERVAL = 1.0
+
+# How often finished jobs older than the retention period are deleted
+PRUNE_EVERY = 600.0
+
+
+class QueueFull(Exception):
+    """Raised when the queue already holds max_pending unfinished jobs."""
+
+
+class JobQueue:
+    """SQLite-backed job queue with atomic, lease-based claims."""
+
+    def __init__(
+        self,
+        path: str,
+        max_pending: int = 10_000,
+        max_attempts: int = 5,
+        lease: float = 600,
+        retention: float = 86_400,
+    ):
+        self.path = path
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self.lease = lease
+        self.retention = retention
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._pruned_at = 0.0
+
+        self._conn = sqlite3.connect(
+            path, timeout=30, check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY,"
+            " status TEXT NOT NULL,"
+            " payload TEXT NOT NULL,"
+            " result TEXT,"
+            " error TEXT,"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " run_after REAL NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " updated_at REAL NOT NULL,"
+            " lease_id TEXT)"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        if "lease_id" not in columns:
+            self._conn.execute("ALTER TABLE jobs ADD COLUMN lease_id TEXT")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, run_after)"
+        )
+
+    def enqueue(self, payload: dict) -> str:
+        """Store a job and return its id, or raise QueueFull."""
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                (count,) = self._conn.execute(
+                    "SELECT COUNT(*) FROM jobs WHERE status IN ('queued', 'running')"
+                ).fetchone()
+                if count >= self.max_pending:
+                    raise QueueFull(f"{count} jobs pending")
+                self._conn.execute(
+                    "INSERT INTO jobs (id, status, payload, run_after, created_at,"
+                    " updated_at) VALUES (?, 'queued', ?, ?, ?, ?)",
+                    (job_id, json.dumps(payload), now, now, now),
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        self._wakeup.set()
+        return job_id
+
+    def claim(self) -> Optional[tuple]:
+        """Lease the oldest ready job to the caller.
+
+        Returns (id, payload, attempt, lease_id). Running jobs whose lease
+        expired (their worker died) count as ready.
+        """
+        now = time.time()
+        lease_id = uuid.uuid4().hex
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT id, payload, attempts FROM jobs"
+                    " WHERE status IN ('queued', 'running') AND run_after <= ?"
+                    " ORDER BY run_after LIMIT 1",
+                    (now,),
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        "UPDATE jobs SET status = 'running', attempts = attempts + 1,"
+                        " run_after = ?, updated_at = ?, lease_id = ? WHERE id = ?",
+                        (now + self.lease, now, lease_id, row[0]),
+                    )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        if row is None:
+            return None
+        return row[0], json.loads(row[1]), row[2] + 1, lease_id
+
+    def renew(self, job_id: str, lease_id: str) -> bool:
+        """Extend a running job's lease; False if the lease was lost."""
+        now = time.time()
+        with self._lock:
+            return (
+                self._conn.execute(
+                    "UPDATE jobs SET run_after = ?, updated_at = ?"
+                    " WHERE id = ? AND lease_id = ? AND status = 'running'",
+                    (now + self.lease, now, job_id, lease_id),
+                ).rowcount
+                == 1
+            )
+
+    def complete(self, job_id: str, lease_id: str, result) -> bool:
+        return self._finish(
+            job_id, lease_id, "done", result=json.dumps(result, default=str)
+        )
+
+    def fail(self, job_id: str, lease_id: str, attempt: int, error: str) -> bool:
+        """Schedule a retry with backoff, or mark the job failed for good."""
+        if attempt >= self.max_attempts:
+            return self._finish(job_id, lease_id, "failed", error=error)
+        delay = min(RETRY_BASE * 2 ** (attempt - 1), RETRY_MAX)
+        now = time.time()
+        with self._lock:
+            return (
+                self._conn.execute(
+                    "UPDATE jobs SET status = 'queued', error = ?, run_after = ?,"
+                    " updated_at = ? WHERE id = ? AND lease_id = ?"
+                    " AND status = 'running'",
+                    (error, now + delay, now, job_id, lease_id),
+                ).rowcount
+                == 1
+            )
+
+    def _finish(
+        self, job_id: str, lease_id: str, status: str, result=None, error=None
+    ) -> bool:
+        """Record the outcome, unless another worker has taken the job over."""
+        with self._lock:
+            return (
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, result = ?, error = ?, updated_at = ?"
+                    " WHERE id = ? AND lease_id = ? AND status = 'running'",
+                    (status, result, error, time.time(), job_id, lease_id),
+                ).rowcount
+                == 1
+            )
+
+    def get(self, job_id: str) -> Optional[dict]:
+        """Return a job's status record, or None if unknown (or pruned)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status, result, error, attempts, created_at, updated_at"
+                " FROM jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        status, result, error, attempts, created_at, updated_at = row
+        return {
+            "job_id": job_id,
+            "status": status,
+            "attempts": attempts,
+            "result": json.loads(result) if result else None,
+            "error": error,
+            "created_at": created_at,
+            "updated_at": updated_at,
+        }
+
+    def prune(self) -> None:
+        """Delete finished jobs older than the retention period, every PRUNE_EVERY."""
+        now = time.time()
+        if now - self._pruned_at < PRUNE_EVERY:
+            return
+        self._pruned_at = now
+        with self._lock:
+            deleted = self._conn.execute(
+                "DELETE FROM jobs WHERE status IN ('done', 'failed')"
+                " AND updated_at < ?",
+                (now - self.retention,),
+            ).rowcount
+        if deleted:
+            logger.info(f"Pruned {deleted} finished jobs")
+
+    def wait(self, timeout: float = POLL_INTERVAL) -> None:
+        """Sleep until a job is enqueued in this process or the timeout passes."""
+        if self._wakeup.wait(timeout):
+            self._wakeup.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) FROM jobs GROUP BY status"
+            ).fetchall()
+        counts = {"queued": 0, "running": 0, "done": 0, "failed": 0, **dict(rows)}
+        return {**counts, "max_pending": self.max_pending}
+
+
+def start_workers(
+    queue: JobQueue, handler: Callable[[str, dict], object], workers: int
+) -> list:
+    """Start daemon threads that claim jobs and run handler(job_id, payload) on each.
+
+    The lease is renewed every lease/3 seconds while the handler runs, so a
+    slow add isn't claimed and run a second time by another worker. SQLite
+    errors (e.g. "database is locked" past the busy timeout) don't kill a
+    worker: it logs, backs off and tries again.
+    """
+
+    def keep_leased(job_id: str, lease_id: str, done: threading.Event):
+        while not done.wait(queue.lease / 3):
+            try:
+                renewed = queue.renew(job_id, lease_id)
+            except sqlite3.Error as e:
+                logger.warning(f"Job {job_id} lease renewal failed: {e}")
+                continue
+            if not renewed:
+                logger.warning(f"Job {job_id} lost its lease while running")
+                return
+
+    def loop():
+        delay = POLL_INTERVAL
+        while True:
+            try:
+                run_next()
+            except sqlite3.Error as e:
+                # A job whose result couldn't be recorded keeps its lease and
+                # is claimed again once that expires
+                logger.warning(f"Job queue error, retrying in {delay:.0f}s: {e}")
+                time.sleep(delay)
+                delay = min(delay * 2, RETRY_MAX)
+            else:
+                delay = POLL_INTERVAL
+
+    def run_next():
+        queue.prune()
+        job = queue.claim()
+        if job is None:
+            queue.wait()
+            return
+        job_id, payload, attempt, lease_id = job
+        done = threading.Event()
+        threading.Thread(
+            target=keep_leased, args=(job_id, lease_id, done), daemon=True
+        ).start()
+        try:
+            result = handler(job_id, payload)
+        except Exception as e:
+            logger.warning(f"Job {job_id} attempt {attempt} failed: {e}")
+            finished = queue.fail(job_id, lease_id, attempt, str(e))
+        else:
+            finished = queue.complete(job_id, lease_id, result)
+        finally:
+            done.set()
+        if not finished:
+            logger.warning(f"Job {job_id} was taken over; dropping this result")
+
+    threads = [
+        threading.Thread(target=loop, name=f"mem0-job-{i}", daemon=True)
+        for i in range(workers)
+    ]
+    for thread in threads:
+        thread.start()
+    return threads
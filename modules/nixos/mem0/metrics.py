@@ -0,0 +1,200 @@
+"""Minimal Prometheus-style metrics for the mem0 MCP server.
+
+No client library: counters, gauges and histograms are kept in dicts keyed
+by label values and rendered in the text exposition format on scrape.
+"""
+
+import functools
+import threading
+import time
+from contextlib import contextmanager
+
+# Recording is skipped entirely unless the server turns this on
+enabled = False
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# Every metric registers itself here on creation
+REGISTRY = []
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple, values: tuple) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(
+        f'{name}="{_escape(value)}"' for name, value in zip(names, values)
+    )
+    return "{" + pairs + "}"
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labels: tuple = ()):
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self._values = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _header(self) -> list:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *label_values, amount: float = 1) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self) -> list:
+        with self._lock:
+            items = sorted(self._values.items())
+        return self._header() + [
+            f"{self.name}{_format_labels(self.labels, key)} {value}"
+            for key, value in items
+        ]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *label_values, amount: float = 1) -> None:
+        self.inc(*label_values, amount=-amount)
+
+    def set(self, *label_values, value: float) -> None:
+        with self._lock:
+            self._values[label_values] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, *label_values, value: float) -> None:
+        with self._lock:
+            state = self._values.get(label_values)
+            if state is None:
+                state = self._values[label_values] = [[0] * len(self.buckets), 0, 0.0]
+            counts = state[0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            state[1] += 1
+            state[2] += value
+
+    def render(self) -> list:
+        with self._lock:
+            items = sorted(
+                (key, ([*state[0]], state[1], state[2]))
+                for key, state in self._values.items()
+            )
+        lines = self._header()
+        names = self.labels + ("le",)
+        for key, (counts, count, total) in items:
+            for bound, bucket_count in zip(self.buckets, counts):
+                labels = _format_labels(names, key + (bound,))
+                lines.append(f"{self.name}_bucket{labels} {bucket_count}")
+            labels = _format_labels(names, key + ("+Inf",))
+            lines.append(f"{self.name}_bucket{labels} {count}")
+            plain = _format_labels(self.labels, key)
+            lines.append(f"{self.name}_count{plain} {count}")
+            lines.append(f"{self.name}_sum{plain} {total}")
+        return lines
+
+
+tool_calls = Counter(
+    "mem0_tool_calls_total", "MCP tool calls by outcome", ("tool", "status")
+)
+tool_duration = Histogram(
+    "mem0_tool_duration_seconds", "End-to-end MCP tool latency", ("tool",)
+)
+phase_duration = Histogram(
+    "mem0_phase_duration_seconds",
+    "Time spent in embed, llm, vector_store and serialize phases",
+    ("phase", "operation"),
+)
+inflight = Gauge("mem0_inflight_requests", "MCP tool calls in progress", ("tool",))
+
+
+def render(extra: list = ()) -> str:
+    """Render every registered metric plus scrape-time extra lines."""
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    lines.extend(extra)
+    return "\n".join(lines) + "\n"
+
+
+def sample(name: str, help_text: str, value: float, kind: str = "gauge") -> list:
+    """Lines for a single value computed at scrape time."""
+    return [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}", f"{name} {value}"]
+
+
+@contextmanager
+def phase(name: str, operation: str = ""):
+    """Time a block of work as one phase."""
+    if not enabled:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        phase_duration.observe(name, operation, value=time.perf_counter() - started)
+
+
+def instrument_tool(fn):
+    """Count calls, in-flight requests and latency of an async MCP tool."""
+    name = fn.__name__
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        if not enabled:
+            return await fn(*args, **kwargs)
+        inflight.inc(name)
+        started = time.perf_counter()
+        status = "error"
+        try:
+            result = await fn(*args, **kwargs)
+            status = "ok"
+            return result
+        finally:
+            inflight.dec(name)
+            tool_duration.observe(name, value=time.perf_counter() - started)
+            tool_calls.inc(name, status)
+
+    return wrapper
+
+
+class TimedProxy:
+    """Wraps a mem0 component and times every method call as a phase.
+
+    Used around the embedder, LLM and vector store so tool latency can be
+    split by where the time actually went.
+    """
+
+    def __init__(self, inner, phase_name: str):
+        self._inner = inner
+        self._phase = phase_name
+
+    def __getattr__(self, name):
+        attr = getattr(self._inner, name)
+        if not callable(attr) or name.startswith("_"):
+            return attr
+
+        @functools.wraps(attr)
+        def timed(*args, **kwargs):
+            with phase(self._phase, name):
+                return attr(*args, **kwargs)
+
+        return timed
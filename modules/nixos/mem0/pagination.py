@@ -0,0 +1,141 @@
+"""Cursor-based paging over a user's memories using Qdrant scroll.
+
+Cursors are opaque to clients: urlsafe base64 of the Qdrant next-page
+offset plus the user it belongs to, so a page is always bounded by `limit`
+no matter how large the collection grows.
+"""
+
+import base64
+import json
+from typing import Optional
+
+MAX_PAGE_SIZE = 1000
+
+# Payload keys mem0 lifts to the top level of a memory record
+PROMOTED_KEYS = ("user_id", "agent_id", "run_id", "actor_id", "role")
+CORE_KEYS = ("data", "hash", "created_at", "updated_at")
+
+# Record field -> payload key, for projections
+FIELD_TO_PAYLOAD = {
+    "memory": "data",
+    "hash": "hash",
+    "created_at": "created_at",
+    "updated_at": "updated_at",
+    **{key: key for key in PROMOTED_KEYS},
+}
+VALID_FIELDS = frozenset({"id", "metadata", *FIELD_TO_PAYLOAD})
+
+
+def encode_cursor(user_id: str, offset) -> Optional[str]:
+    if offset is None:
+        return None
+    raw = json.dumps({"u": user_id, "o": offset}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, user_id: str):
+    """Return the Qdrant offset stored in cursor, checking it belongs to user_id."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded))
+        owner, offset = data["u"], data["o"]
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if owner != user_id:
+        raise ValueError("Cursor belongs to a different user")
+    return offset
+
+
+def parse_fields(
+    fields: Optional[str], valid: Optional[frozenset] = VALID_FIELDS
+) -> Optional[list]:
+    """Parse a comma-separated projection, or None for full records.
+
+    Names outside valid are rejected; pass valid=None for results whose
+    records don't have the memory record shape (search scores, history).
+    """
+    if not fields:
+        return None
+    wanted = [f.strip() for f in fields.split(",") if f.strip()]
+    if not wanted:
+        return None
+    unknown = set(wanted) - valid if valid is not None else set()
+    if unknown:
+        raise ValueError(f"Unknown fields {sorted(unknown)}; valid: {sorted(valid)}")
+    return wanted
+
+
+def format_point(point, fields: Optional[list] = None) -> dict:
+    """Turn a Qdrant point into the record shape mem0's get_all returns."""
+    payload = point.payload or {}
+    record = {
+        "id": str(point.id),
+        "memory": payload.get("data"),
+        "hash": payload.get("hash"),
+        "created_at": payload.get("created_at"),
+        "updated_at": payload.get("updated_at"),
+    }
+    for key in PROMOTED_KEYS:
+        if key in payload:
+            record[key] = payload[key]
+    metadata = {
+        k: v for k, v in payload.items() if k not in CORE_KEYS + PROMOTED_KEYS
+    }
+    if metadata:
+        record["metadata"] = metadata
+    if fields is None:
+        return record
+    return {field: record.get(field) for field in fields}
+
+
+def scroll_page(
+    vector_store,
+    user_id: str,
+    limit: int,
+    cursor: Optional[str] = None,
+    fields: Optional[list] = None,
+) -> dict:
+    """Fetch one page of a user's memories straight from Qdrant."""
+    from qdrant_client.models import FieldCondition, Filter, MatchValue
+
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    offset = decode_cursor(cursor, user_id) if cursor else None
+
+    # Only pull the payload keys the projection needs
+    with_payload = True
+    if fields is not None and "metadata" not in fields:
+        with_payload = [FIELD_TO_PAYLOAD[f] for f in fields if f in FIELD_TO_PAYLOAD]
+
+    points, next_offset = vector_store.client.scroll(
+        collection_name=vector_store.collection_name,
+        scroll_filter=Filter(
+            must=[FieldCondition(key="user_id", match=MatchValue(value=user_id))]
+        ),
+        limit=limit,
+        offset=offset,
+        with_payload=with_payload or False,
+        with_vectors=False,
+    )
+    return {
+        "results": [format_point(point, fields) for point in points],
+        "next_cursor": encode_cursor(user_id, next_offset),
+    }
+
+
+def find_by_metadata(vector_store, user_id: str, key: str, value) -> list:
+    """Return a user's memories whose metadata has key == value."""
+    from qdrant_client.models import FieldCondition, Filter, MatchValue
+
+    points, _ = vector_store.client.scroll(
+        collection_name=vector_store.collection_name,
+        scroll_filter=Filter(
+            must=[
+                FieldCondition(key="user_id", match=MatchValue(value=user_id)),
+                FieldCondition(key=key, match=MatchValue(value=value)),
+            ]
+        ),
+        limit=MAX_PAGE_SIZE,
+        with_payload=True,
+        with_vectors=False,
+    )
+    return [format_point(point) for point in points]
@@ -0,0 +1,134 @@
+"""In-process cache of search_memories results.
+
+Entries are keyed by (user_id, normalized query, limit) and tagged with the
+user's write generation at the time the search started. Every write bumps
+the generation, so a cached result is only served if nothing touched that
+user since the search began; the TTL bounds staleness from writers outside
+this process (e.g. the ingest CLI).
+
+Server processes behind the dispatcher share generations through a small
+SQLite file instead, so a write handled by one worker (or a queued add
+drained by another) invalidates the user's searches cached on every worker.
+"""
+
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.split())
+
+
+class SearchCache:
+    """LRU search result cache with per-user generation invalidation."""
+
+    # Row of the shared generations table bumped by invalidate(None)
+    GLOBAL_KEY = ""
+
+    def __init__(
+        self,
+        ttl: float = 300,
+        max_entries: int = 10_000,
+        generations_path: Optional[str] = None,
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._generations = {}
+        self._global_generation = 0
+        self._lock = threading.Lock()
+        self._shared = None
+        if generations_path and self.enabled:
+            self._shared = sqlite3.connect(
+                generations_path,
+                timeout=30,
+                check_same_thread=False,
+                isolation_level=None,
+            )
+            self._shared.execute("PRAGMA journal_mode=WAL")
+            self._shared.execute("PRAGMA synchronous=NORMAL")
+            self._shared.execute(
+                "CREATE TABLE IF NOT EXISTS generations"
+                " (user_id TEXT PRIMARY KEY, generation INTEGER NOT NULL)"
+            )
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_entries > 0
+
+    def generation(self, user_id: str) -> tuple:
+        """Snapshot the generation to tag a search with before it runs."""
+        with self._lock:
+            return self._current(user_id)
+
+    def _current(self, user_id: str) -> tuple:
+        if self._shared is None:
+            return (self._global_generation, self._generations.get(user_id, 0))
+        rows = dict(
+            self._shared.execute(
+                "SELECT user_id, generation FROM generations WHERE user_id IN (?, ?)",
+                (self.GLOBAL_KEY, user_id),
+            ).fetchall()
+        )
+        return (rows.get(self.GLOBAL_KEY, 0), rows.get(user_id, 0))
+
+    def get(self, user_id: str, query: str, limit: int):
+        """Return a cached result, or None if missing, expired or invalidated."""
+        if not self.enabled:
+            return None
+        key = (user_id, normalize_query(query), limit)
+        with self._lock:
+            entry = self._entries.get(key)
+            current = self._current(user_id)
+            if entry is None or entry[0] != current or entry[1] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def put(
+        self, user_id: str, query: str, limit: int, generation: tuple, result
+    ) -> None:
+        if not self.enabled:
+            return
+        key = (user_id, normalize_query(query), limit)
+        with self._lock:
+            self._entries[key] = (generation, time.monotonic() + self.ttl, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: Optional[str] = None) -> None:
+        """Invalidate one user's results, or everyone's if the user is unknown."""
+        with self._lock:
+            if self._shared is not None:
+                self._shared.execute(
+                    "INSERT INTO generations (user_id, generation) VALUES (?, 1)"
+                    " ON CONFLICT (user_id) DO UPDATE SET generation = generation + 1",
+                    (self.GLOBAL_KEY if user_id is None else user_id,),
+                )
+            elif user_id is None:
+                self._global_generation += 1
+            else:
+                self._generations[user_id] = self._generations.get(user_id, 0) + 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = len(self._entries)
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
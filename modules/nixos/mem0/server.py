@@ -1,20 +1,51 @@
 #!/usr/bin/env python3
+import time
+
+STARTED_AT = time.monotonic()
+
 import os
 import json
+import asyncio
+import functools
 import logging
-from typing import Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Union
 
-from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp import Context, FastMCP
 from pydantic import Field
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
 
 os.environ["MEM0_TELEMETRY"] = "false"
 os.environ["ANONYMIZED_TELEMETRY"] = "false"
 
-from mem0 import Memory
+import collection
+import dispatcher
+import encoding
+import ingest
+import metrics
+import pagination
+from embedding_cache import CachedEmbedder, EmbeddingCache
+from job_queue import JobQueue, QueueFull, start_workers
+from search_cache import SearchCache
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("mem0-mcp")
 
+
+def env_flag(name: str, default: bool = False) -> bool:
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.lower() in ("1", "true", "yes")
+
+
+def env_int(name: str) -> Optional[int]:
+    value = os.environ.get(name)
+    return int(value) if value else None
+
+
 DATA_DIR = os.environ.get("MEM0_DATA_DIR", "/var/lib/mem0")
 DEFAULT_USER_ID = os.environ.get("MEM0_DEFAULT_USER_ID", "default")
 
@@ -25,8 +56,55 @@ LLM_MODEL = os.environ.get("MEM0_LLM_MODEL", "gpt-4o-mini")
 
 QDRANT_HOST = os.environ.get("MEM0_QDRANT_HOST", "localhost")
 QDRANT_PORT = int(os.environ.get("MEM0_QDRANT_PORT", "6333"))
+QDRANT_GRPC_PORT = int(os.environ.get("MEM0_QDRANT_GRPC_PORT", "6334"))
+QDRANT_PREFER_GRPC = env_flag("MEM0_QDRANT_PREFER_GRPC")
+QDRANT_TIMEOUT = int(os.environ.get("MEM0_QDRANT_TIMEOUT", "10"))
 QDRANT_PATH = os.environ.get("MEM0_QDRANT_PATH")
 
+COLLECTION_NAME = os.environ.get("MEM0_COLLECTION", "mem0_memories")
+QUANTIZATION = os.environ.get("MEM0_QDRANT_QUANTIZATION", "none")
+ON_DISK_VECTORS = env_flag("MEM0_QDRANT_ON_DISK_VECTORS")
+ON_DISK_PAYLOAD = env_flag("MEM0_QDRANT_ON_DISK_PAYLOAD")
+HNSW_M = env_int("MEM0_QDRANT_HNSW_M")
+HNSW_EF_CONSTRUCT = env_int("MEM0_QDRANT_HNSW_EF_CONSTRUCT")
+HNSW_EF = env_int("MEM0_QDRANT_HNSW_EF")
+INDEX_USER_ID = env_flag("MEM0_QDRANT_INDEX_USER_ID", True)
+
+WRITE_WORKERS = int(os.environ.get("MEM0_WRITE_WORKERS", "2"))
+READ_WORKERS = int(os.environ.get("MEM0_READ_WORKERS", "8"))
+
+# eager: build Memory before serving; background: serve immediately and warm
+# up in a thread; lazy: build Memory on the first tool call
+INIT_MODE = os.environ.get("MEM0_INIT_MODE", "background")
+
+SEARCH_CACHE_TTL = float(os.environ.get("MEM0_SEARCH_CACHE_TTL", "300"))
+SEARCH_CACHE_MAX_ENTRIES = int(os.environ.get("MEM0_SEARCH_CACHE_MAX_ENTRIES", "10000"))
+# Shared write generations; set for the workers of `server.py dispatch`
+SEARCH_GENERATIONS_PATH = os.environ.get("MEM0_SEARCH_GENERATIONS_PATH")
+
+METRICS_ENABLED = env_flag("MEM0_METRICS")
+metrics.enabled = METRICS_ENABLED
+
+EMBED_CACHE_ENABLED = env_flag("MEM0_EMBED_CACHE", True)
+EMBED_CACHE_PATH = os.environ.get(
+    "MEM0_EMBED_CACHE_PATH", os.path.join(DATA_DIR, "embedding-cache.sqlite")
+)
+EMBED_CACHE_MAX_ENTRIES = int(os.environ.get("MEM0_EMBED_CACHE_MAX_ENTRIES", "100000"))
+
+# Background add_memory: a durable queue under DATA_DIR drained by job workers
+ASYNC_WRITES = env_flag("MEM0_ASYNC_WRITES")
+JOB_WORKERS = int(os.environ.get("MEM0_JOB_WORKERS", "2"))
+JOB_MAX_PENDING = int(os.environ.get("MEM0_JOB_MAX_PENDING", "10000"))
+JOB_MAX_ATTEMPTS = int(os.environ.get("MEM0_JOB_MAX_ATTEMPTS", "5"))
+JOB_QUEUE_PATH = os.environ.get(
+    "MEM0_JOB_QUEUE_PATH", os.path.join(DATA_DIR, "jobs.sqlite")
+)
+
+# Default tool response encoding: pretty, compact or jsonl (see encoding.py)
+RESPONSE_FORMAT = encoding.check_format(
+    os.environ.get("MEM0_RESPONSE_FORMAT", "pretty")
+)
+
 EMBEDDING_DIMS = {
     "voyageai": {"voyage-3": 1024, "voyage-3-lite": 512, "voyage-2": 1024},
     "openai": {"text-embedding-3-small": 1536, "text-embedding-3-large": 3072},
@@ -39,14 +117,46 @@ def get_embedding_dims() -> int:
     return provider_dims.get(EMBEDDER_MODEL, 1024)
 
 
+def build_qdrant_client():
+    """Build the long-lived Qdrant client shared by every worker thread.
+
+    Over HTTP it keeps a keep-alive connection pool sized to the worker
+    pools; with gRPC preferred, calls share one multiplexed channel.
+    """
+    import httpx
+    from qdrant_client import QdrantClient
+
+    connections = WRITE_WORKERS + READ_WORKERS
+    if QDRANT_PREFER_GRPC:
+        endpoint = f"{QDRANT_HOST}:{QDRANT_GRPC_PORT} (gRPC)"
+    else:
+        endpoint = f"{QDRANT_HOST}:{QDRANT_PORT} (HTTP)"
+    logger.info(f"Connecting to Qdrant at {endpoint}, timeout {QDRANT_TIMEOUT}s")
+    return QdrantClient(
+        host=QDRANT_HOST,
+        port=QDRANT_PORT,
+        grpc_port=QDRANT_GRPC_PORT,
+        prefer_grpc=QDRANT_PREFER_GRPC,
+        timeout=QDRANT_TIMEOUT,
+        limits=httpx.Limits(
+            max_connections=connections, max_keepalive_connections=connections
+        ),
+        grpc_options={
+            "grpc.keepalive_time_ms": 30_000,
+            "grpc.keepalive_permit_without_calls": 1,
+        },
+    )
+
+
 def build_config() -> dict:
     config = {
         "version": "v1.1",
         "vector_store": {
             "provider": "qdrant",
             "config": {
-                "collection_name": "mem0_memories",
+                "collection_name": COLLECTION_NAME,
                 "embedding_model_dims": get_embedding_dims(),
+                "on_disk": ON_DISK_VECTORS,
             },
         },
         "embedder": {
@@ -67,23 +177,290 @@ def build_config() -> dict:
 
     if QDRANT_PATH:
         config["vector_store"]["config"]["path"] = QDRANT_PATH
+        # mem0 wipes an embedded store's directory on start unless on_disk is set
+        config["vector_store"]["config"]["on_disk"] = True
     else:
+        # host/port are still required by mem0's config validation
         config["vector_store"]["config"]["host"] = QDRANT_HOST
         config["vector_store"]["config"]["port"] = QDRANT_PORT
+        config["vector_store"]["config"]["client"] = build_qdrant_client()
 
     return config
 
 
-logger.info(
-    f"Initializing mem0 with {EMBEDDER_PROVIDER}/{EMBEDDER_MODEL} embeddings, {LLM_PROVIDER}/{LLM_MODEL} LLM"
+def tune_collection(memory) -> None:
+    """Apply quantization, on-disk, HNSW and index settings to the collection."""
+    if QDRANT_PATH:
+        # Embedded Qdrant ignores these; they only matter on a Qdrant server
+        return
+    store = memory.vector_store
+    collection.apply_settings(
+        store.client,
+        store.collection_name,
+        quantization=QUANTIZATION,
+        on_disk_vectors=ON_DISK_VECTORS,
+        on_disk_payload=ON_DISK_PAYLOAD,
+        hnsw_m=HNSW_M,
+        hnsw_ef_construct=HNSW_EF_CONSTRUCT,
+        index_user_id=INDEX_USER_ID,
+    )
+    collection.install_search_params(
+        store, collection.search_params(QUANTIZATION, HNSW_EF)
+    )
+
+
+def build_embedder(memory) -> Optional[EmbeddingCache]:
+    """Put the on-disk embedding cache in front of the configured embedder."""
+    if not EMBED_CACHE_ENABLED:
+        return None
+    os.makedirs(os.path.dirname(EMBED_CACHE_PATH), exist_ok=True)
+    cache = EmbeddingCache(EMBED_CACHE_PATH, max_entries=EMBED_CACHE_MAX_ENTRIES)
+    memory.embedding_model = CachedEmbedder(
+        memory.embedding_model, cache, EMBEDDER_PROVIDER, EMBEDDER_MODEL
+    )
+    logger.info(f"Embedding cache at {EMBED_CACHE_PATH}: {cache.stats()}")
+    return cache
+
+
+# Built on first use (or by the warm-up thread) so the MCP endpoint comes up
+# without waiting for mem0 imports and the Qdrant connection
+_memory = None
+_memory_lock = threading.Lock()
+embedding_cache: Optional[EmbeddingCache] = None
+search_cache = SearchCache(
+    ttl=SEARCH_CACHE_TTL,
+    max_entries=SEARCH_CACHE_MAX_ENTRIES,
+    generations_path=SEARCH_GENERATIONS_PATH,
 )
-memory = Memory.from_config(build_config())
+# Set up by start_job_queue() when serving with job workers
+jobs: Optional[JobQueue] = None
+
+
+def get_memory():
+    """Return the shared Memory client, building it on first use."""
+    global _memory, embedding_cache
+    if _memory is not None:
+        return _memory
+    with _memory_lock:
+        if _memory is None:
+            logger.info(
+                f"Initializing mem0 with {EMBEDDER_PROVIDER}/{EMBEDDER_MODEL} "
+                f"embeddings, {LLM_PROVIDER}/{LLM_MODEL} LLM"
+            )
+            t0 = time.monotonic()
+            from mem0 import Memory
+
+            t1 = time.monotonic()
+            instance = Memory.from_config(build_config())
+            tune_collection(instance)
+            t2 = time.monotonic()
+            embedding_cache = build_embedder(instance)
+            if metrics.enabled:
+                instance.embedding_model = metrics.TimedProxy(
+                    instance.embedding_model, "embed"
+                )
+                instance.llm = metrics.TimedProxy(instance.llm, "llm")
+                instance.vector_store = metrics.TimedProxy(
+                    instance.vector_store, "vector_store"
+                )
+            t3 = time.monotonic()
+            _memory = instance
+            logger.info(
+                f"mem0 ready {t3 - STARTED_AT:.2f}s after start "
+                f"(import mem0 {t1 - t0:.2f}s, Memory.from_config {t2 - t1:.2f}s, "
+                f"embedding cache {t3 - t2:.2f}s)"
+            )
+    return _memory
+
+
+async def memory_ready():
+    """Await the Memory client without blocking the event loop."""
+    if _memory is not None:
+        return _memory
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, get_memory)
+
+
+def warm_memory() -> None:
+    """Build the Memory client in the background; failures retry on first use."""
+    try:
+        get_memory()
+    except Exception:
+        logger.exception("Background mem0 initialization failed")
+
+
+# Memory calls block (LLM, embedder, Qdrant), so they run off the event loop.
+# Writes and reads get separate pools: a slow LLM-bound add never queues
+# in front of a search.
+write_pool = ThreadPoolExecutor(
+    max_workers=WRITE_WORKERS, thread_name_prefix="mem0-write"
+)
+read_pool = ThreadPoolExecutor(max_workers=READ_WORKERS, thread_name_prefix="mem0-read")
+
+
+async def run_write(fn, *args, **kwargs):
+    """Run a blocking write-path Memory call on the write pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        write_pool, functools.partial(fn, *args, **kwargs)
+    )
+
+
+async def run_read(fn, *args, **kwargs):
+    """Run a blocking read-path Memory call on the read pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        read_pool, functools.partial(fn, *args, **kwargs)
+    )
+
+
+async def run_user_write(user_ids, fn, *args, **kwargs):
+    """Run a write and invalidate cached searches of the users it touched.
+
+    A user_id of None (owner unknown) invalidates every user's searches.
+    """
+    try:
+        return await run_write(fn, *args, **kwargs)
+    finally:
+        for uid in user_ids:
+            search_cache.invalidate(uid)
+
+
+def run_add_job(job_id: str, payload: dict):
+    """Process one queued add_memory call on the write pool.
+
+    Added memories carry the job id in their metadata, so a job that runs
+    again (its earlier run died after adding) returns those instead of
+    adding the facts twice.
+    """
+    memory = get_memory()
+    uid = payload["user_id"]
+    with metrics.phase("vector_store", "scroll"):
+        added = pagination.find_by_metadata(memory.vector_store, uid, "job_id", job_id)
+    if added:
+        logger.info(f"Job {job_id} already added {len(added)} memories")
+        return {
+            "results": [
+                {"id": r["id"], "memory": r["memory"], "event": "ADD"} for r in added
+            ]
+        }
+    metadata = {**(payload["metadata"] or {}), "job_id": job_id}
+    try:
+        return write_pool.submit(
+            memory.add, payload["content"], user_id=uid, metadata=metadata
+        ).result()
+    finally:
+        search_cache.invalidate(uid)
+
+
+def start_job_queue() -> None:
+    """Open the job queue and start draining it, including jobs left from before."""
+    global jobs
+    if JOB_WORKERS <= 0:
+        return
+    os.makedirs(os.path.dirname(JOB_QUEUE_PATH), exist_ok=True)
+    jobs = JobQueue(
+        JOB_QUEUE_PATH, max_pending=JOB_MAX_PENDING, max_attempts=JOB_MAX_ATTEMPTS
+    )
+    start_workers(jobs, run_add_job, JOB_WORKERS)
+    logger.info(f"Job queue at {JOB_QUEUE_PATH}: {jobs.stats()}")
+
+
+def owner_of(memory, memory_id: str) -> Optional[str]:
+    """Return the user a memory belongs to, or None if it can't be looked up."""
+    try:
+        record = memory.get(memory_id)
+    except Exception:
+        return None
+    return record.get("user_id") if record else None
+
+
+def to_json(
+    result, fmt: Optional[str] = None, fields: Optional[str] = None
+) -> Union[str, list]:
+    """Serialize a tool result (timed as the serialize phase).
+
+    fmt overrides the configured response format; fields trims every record
+    of the result to the given comma-separated keys.
+    """
+    with metrics.phase("serialize"):
+        result = encoding.project(result, encoding.parse_fields(fields, valid=None))
+        return encoding.encode(result, fmt or RESPONSE_FORMAT)
+
+
+def scroll_memories(memory, *args):
+    with metrics.phase("vector_store", "scroll"):
+        return pagination.scroll_page(memory.vector_store, *args)
+
+
+def collect_metrics() -> str:
+    """Render metrics, adding cache and collection gauges sampled now."""
+    extra = []
+    if embedding_cache:
+        stats = embedding_cache.stats()
+        extra += metrics.sample(
+            "mem0_embedding_cache_hits_total",
+            "Embedding cache hits",
+            stats["hits"],
+            "counter",
+        )
+        extra += metrics.sample(
+            "mem0_embedding_cache_misses_total",
+            "Embedding cache misses",
+            stats["misses"],
+            "counter",
+        )
+        extra += metrics.sample(
+            "mem0_embedding_cache_entries", "Cached embeddings", stats["entries"]
+        )
+    search_stats = search_cache.stats()
+    extra += metrics.sample(
+        "mem0_search_cache_hits_total",
+        "Search result cache hits",
+        search_stats["hits"],
+        "counter",
+    )
+    extra += metrics.sample(
+        "mem0_search_cache_misses_total",
+        "Search result cache misses",
+        search_stats["misses"],
+        "counter",
+    )
+    if jobs is not None:
+        job_stats = jobs.stats()
+        for status in ("queued", "running", "failed"):
+            extra += metrics.sample(
+                f"mem0_jobs_{status}", f"add_memory jobs {status}", job_stats[status]
+            )
+    if _memory is not None:
+        store = _memory.vector_store
+        try:
+            points = store.client.count(
+                collection_name=store.collection_name, exact=False
+            ).count
+            extra += metrics.sample(
+                "mem0_collection_points", "Points in the mem0 Qdrant collection", points
+            )
+        except Exception as e:
+            logger.warning(f"Could not count collection points: {e}")
+    return metrics.render(extra)
+
 
 mcp = FastMCP("mem0-self-hosted")
 
 
+if METRICS_ENABLED:
+
+    @mcp.custom_route("/metrics", methods=["GET"])
+    async def metrics_endpoint(request: Request) -> PlainTextResponse:
+        loop = asyncio.get_running_loop()
+        body = await loop.run_in_executor(None, collect_metrics)
+        return PlainTextResponse(body, media_type="text/plain; version=0.0.4")
+
+
 @mcp.tool()
-def add_memory(
+@metrics.instrument_tool
+async def add_memory(
     content: str = Field(description="The content/fact to store as a memory"),
     user_id: Optional[str] = Field(
         default=None, description="User ID to associate with this memory"
@@ -91,102 +468,289 @@ def add_memory(
     metadata: Optional[str] = Field(
         default=None, description="JSON string of additional metadata"
     ),
-) -> str:
-    """Add a new memory to the store. Returns the created memory details."""
+    wait: Optional[bool] = Field(
+        default=None,
+        description="Wait for fact extraction; false queues the write and returns a job_id for get_job_status (default: server setting)",
+    ),
+) -> Union[str, list]:
+    """Add a new memory. Returns the created memory details, or a job id if queued."""
     uid = user_id or DEFAULT_USER_ID
     meta = json.loads(metadata) if metadata else None
 
-    result = memory.add(content, user_id=uid, metadata=meta)
+    background = ASYNC_WRITES if wait is None else not wait
+    if background and jobs is None:
+        raise ValueError("Background writes are disabled (no job workers)")
+    if background:
+        payload = {"content": content, "user_id": uid, "metadata": meta}
+        loop = asyncio.get_running_loop()
+        try:
+            job_id = await loop.run_in_executor(None, jobs.enqueue, payload)
+        except QueueFull as e:
+            # Backpressure: a full queue makes callers wait for their own write
+            logger.warning(f"Job queue full ({e}), adding synchronously")
+        else:
+            logger.info(f"Queued memory for user {uid} as job {job_id}")
+            return to_json({"status": "queued", "job_id": job_id})
+
+    memory = await memory_ready()
+    result = await run_user_write(
+        [uid], memory.add, content, user_id=uid, metadata=meta
+    )
     logger.info(f"Added memory for user {uid}: {content[:50]}...")
-    return json.dumps(result, indent=2)
+    return to_json(result)
+
+
+@mcp.tool()
+@metrics.instrument_tool
+async def add_memories(
+    items: str = Field(
+        description='JSON array of memories: strings or {"content", "user_id", "metadata"} objects'
+    ),
+    user_id: Optional[str] = Field(
+        default=None, description="User ID for items that don't specify one"
+    ),
+    infer: bool = Field(
+        default=True,
+        description="Extract facts with the LLM; false stores content verbatim with bulk embedding and upsert",
+    ),
+    group_size: int = Field(
+        default=ingest.DEFAULT_GROUP_SIZE,
+        description="Items per LLM extraction prompt when infer is true",
+    ),
+    ctx: Context = None,
+) -> Union[str, list]:
+    """Add many memories in one call. Returns the created memory details."""
+    memory = await memory_ready()
+    uid = user_id or DEFAULT_USER_ID
+    batch = ingest.normalize_items(json.loads(items), uid)
+    groups = ingest.group_items(batch, group_size, infer)
+
+    # Submit every group up front; the write pool bounds how many run at once
+    tasks = [
+        asyncio.ensure_future(
+            run_user_write(
+                {item["user_id"] for item in group},
+                ingest.ingest_group,
+                memory,
+                group,
+                infer,
+                EMBEDDER_PROVIDER,
+            )
+        )
+        for group in groups
+    ]
+    results = []
+    done = 0
+    for group, task in zip(groups, tasks):
+        results.extend(await task)
+        done += len(group)
+        if ctx is not None:
+            await ctx.report_progress(done, len(batch))
+
+    logger.info(f"Added {len(batch)} items in {len(groups)} groups (infer={infer})")
+    return to_json({"results": results})
 
 
 @mcp.tool()
-def search_memories(
+@metrics.instrument_tool
+async def search_memories(
     query: str = Field(description="Search query to find relevant memories"),
     user_id: Optional[str] = Field(
         default=None, description="User ID to search memories for"
     ),
     limit: int = Field(default=10, description="Maximum number of results to return"),
-) -> str:
+    fields: Optional[str] = Field(
+        default=None,
+        description="Comma-separated fields to return per result, e.g. 'id,memory,score'",
+    ),
+    format: Optional[str] = Field(
+        default=None,
+        description="Response encoding: pretty, compact or jsonl (chunked, one record per line); default is the server setting",
+    ),
+) -> Union[str, list]:
     """Search for memories matching the query. Returns relevant memories with scores."""
+    memory = await memory_ready()
     uid = user_id or DEFAULT_USER_ID
 
-    results = memory.search(query, user_id=uid, limit=limit)
-    logger.info(f"Search for '{query[:30]}...' returned {len(results)} results")
-    return json.dumps(results, indent=2)
+    generation = search_cache.generation(uid)
+    results = search_cache.get(uid, query, limit)
+    cached = results is not None
+    if not cached:
+        results = await run_read(memory.search, query, user_id=uid, limit=limit)
+        search_cache.put(uid, query, limit, generation, results)
+
+    count = len(results["results"]) if isinstance(results, dict) else len(results)
+    logger.info(
+        f"Search for '{query[:30]}...' returned {count} results"
+        f"{' (cached)' if cached else ''}"
+    )
+    return to_json(results, format, fields)
 
 
 @mcp.tool()
-def get_all_memories(
+@metrics.instrument_tool
+async def get_all_memories(
     user_id: Optional[str] = Field(
         default=None, description="User ID to get memories for"
     ),
-) -> str:
-    """Get all memories for a user."""
+    limit: int = Field(
+        default=100,
+        description=f"Maximum memories per page (1-{pagination.MAX_PAGE_SIZE})",
+    ),
+    cursor: Optional[str] = Field(
+        default=None, description="next_cursor from a previous page to continue from"
+    ),
+    fields: Optional[str] = Field(
+        default=None,
+        description="Comma-separated fields to return, e.g. 'id,memory,created_at'",
+    ),
+    format: Optional[str] = Field(
+        default=None,
+        description="Response encoding: pretty, compact or jsonl (chunked, one record per line); default is the server setting",
+    ),
+) -> Union[str, list]:
+    """Get a page of memories for a user. Pass next_cursor back for the next page."""
+    memory = await memory_ready()
     uid = user_id or DEFAULT_USER_ID
+    projection = pagination.parse_fields(fields)
 
-    results = memory.get_all(user_id=uid)
-    logger.info(f"Retrieved {len(results)} memories for user {uid}")
-    return json.dumps(results, indent=2)
+    page = await run_read(scroll_memories, memory, uid, limit, cursor, projection)
+    logger.info(f"Retrieved {len(page['results'])} memories for user {uid}")
+    return to_json(page, format)
 
 
 @mcp.tool()
-def get_memory(
+@metrics.instrument_tool
+async def get_memory(
     memory_id: str = Field(description="The ID of the memory to retrieve"),
-) -> str:
+    format: Optional[str] = Field(
+        default=None,
+        description="Response encoding: pretty, compact or jsonl (chunked, one record per line); default is the server setting",
+    ),
+) -> Union[str, list]:
     """Get a specific memory by ID."""
-    result = memory.get(memory_id)
-    return json.dumps(result, indent=2)
+    memory = await memory_ready()
+    result = await run_read(memory.get, memory_id)
+    return to_json(result, format)
 
 
 @mcp.tool()
-def update_memory(
+@metrics.instrument_tool
+async def update_memory(
     memory_id: str = Field(description="The ID of the memory to update"),
     content: str = Field(description="The new content for the memory"),
 ) -> str:
     """Update an existing memory's content."""
-    result = memory.update(memory_id, content)
+    memory = await memory_ready()
+    owner = await run_read(owner_of, memory, memory_id)
+    result = await run_user_write([owner], memory.update, memory_id, content)
     logger.info(f"Updated memory {memory_id}")
-    return json.dumps(result, indent=2)
+    return to_json(result)
 
 
 @mcp.tool()
-def delete_memory(
+@metrics.instrument_tool
+async def delete_memory(
     memory_id: str = Field(description="The ID of the memory to delete"),
 ) -> str:
     """Delete a specific memory by ID."""
-    memory.delete(memory_id)
+    memory = await memory_ready()
+    owner = await run_read(owner_of, memory, memory_id)
+    await run_user_write([owner], memory.delete, memory_id)
     logger.info(f"Deleted memory {memory_id}")
-    return json.dumps({"status": "deleted", "memory_id": memory_id})
+    return to_json({"status": "deleted", "memory_id": memory_id})
 
 
 @mcp.tool()
-def delete_all_memories(
+@metrics.instrument_tool
+async def delete_all_memories(
     user_id: Optional[str] = Field(
         default=None, description="User ID to delete all memories for"
     ),
 ) -> str:
     """Delete all memories for a user. Use with caution!"""
+    memory = await memory_ready()
     uid = user_id or DEFAULT_USER_ID
 
-    memory.delete_all(user_id=uid)
+    await run_user_write([uid], memory.delete_all, user_id=uid)
     logger.info(f"Deleted all memories for user {uid}")
-    return json.dumps({"status": "deleted_all", "user_id": uid})
+    return to_json({"status": "deleted_all", "user_id": uid})
 
 
 @mcp.tool()
-def get_memory_history(
+@metrics.instrument_tool
+async def get_memory_history(
     memory_id: str = Field(description="The ID of the memory to get history for"),
-) -> str:
+    fields: Optional[str] = Field(
+        default=None,
+        description="Comma-separated fields to return per version, e.g. 'event,new_memory,created_at'",
+    ),
+    format: Optional[str] = Field(
+        default=None,
+        description="Response encoding: pretty, compact or jsonl (chunked, one record per line); default is the server setting",
+    ),
+) -> Union[str, list]:
     """Get the history/versions of a specific memory."""
-    result = memory.history(memory_id)
-    return json.dumps(result, indent=2)
+    memory = await memory_ready()
+    result = await run_read(memory.history, memory_id)
+    return to_json(result, format, fields)
+
+
+@mcp.tool()
+@metrics.instrument_tool
+async def get_job_status(
+    job_id: str = Field(description="The job_id returned by a queued add_memory"),
+) -> str:
+    """Get the status of a queued add_memory: queued, running, done or failed."""
+    if jobs is None:
+        raise ValueError("Background writes are disabled (no job workers)")
+    loop = asyncio.get_running_loop()
+    status = await loop.run_in_executor(None, jobs.get, job_id)
+    if status is None:
+        raise ValueError(f"Unknown job {job_id}")
+    return to_json(status)
+
+
+@mcp.tool()
+@metrics.instrument_tool
+async def get_server_stats() -> str:
+    """Get cache hit/miss counters and other server statistics."""
+    stats = {
+        "embedding_cache": None,
+        "search_cache": search_cache.stats(),
+        "job_queue": None,
+    }
+    if embedding_cache:
+        stats["embedding_cache"] = await run_read(embedding_cache.stats)
+    if jobs is not None:
+        stats["job_queue"] = await run_read(jobs.stats)
+    return to_json(stats)
 
 
 if __name__ == "__main__":
     import sys
 
+    if sys.argv[1:2] == ["dispatch"]:
+        # Workers inherit this, so a write on one invalidates every worker's cache
+        os.environ.setdefault(
+            "MEM0_SEARCH_GENERATIONS_PATH",
+            os.path.join(DATA_DIR, "search-generations.sqlite"),
+        )
+        sys.exit(
+            dispatcher.run_cli(sys.argv[2:], os.path.abspath(__file__), QDRANT_PATH)
+        )
+
+    if sys.argv[1:2] == ["ingest"]:
+        sys.exit(
+            ingest.run_cli(
+                get_memory(),
+                sys.argv[2:],
+                DEFAULT_USER_ID,
+                EMBEDDER_PROVIDER,
+                write_pool,
+            )
+        )
+
     host = "127.0.0.1"
     port = 8050
 
@@ -197,5 +761,19 @@ if __name__ == "__main__":
         elif arg == "--port" and i + 1 < len(args):
             port = int(args[i + 1])
 
-    logger.info(f"Starting mem0 MCP server on {host}:{port}")
-    mcp.run(transport="sse", host=host, port=port)
+    if INIT_MODE == "eager":
+        get_memory()
+    elif INIT_MODE == "background":
+        threading.Thread(target=warm_memory, name="mem0-warmup", daemon=True).start()
+    start_job_queue()
+
+    logger.info(
+        f"Starting mem0 MCP server on {host}:{port} "
+        f"({WRITE_WORKERS} write / {READ_WORKERS} read workers, init={INIT_MODE}, "
+        f"metrics={'on' if METRICS_ENABLED else 'off'}, "
+        f"async writes={'on' if ASYNC_WRITES else 'off'}, "
+        f"{time.monotonic() - STARTED_AT:.2f}s after start)"
+    )
+    mcp.settings.host = host
+    mcp.settings.port = port
+    mcp.run(transport="sse")
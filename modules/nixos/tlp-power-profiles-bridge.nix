@@ -13,6 +13,49 @@ in
 {
   options.services.tlp-power-profiles-bridge = {
     enable = lib.mkEnableOption "TLP to power-profiles-daemon D-Bus bridge for COSMIC";
+
+    backend = lib.mkOption {
+      type = lib.types.enum [
+        "tlp"
+        "sysfs"
+      ];
+      default = "tlp";
+      description = ''
+        How profile switches are applied: "tlp" runs a full `tlp ac|bat|start`; "sysfs" writes
+        only the governor, EPP, platform profile, P-state limits and boost from services.tlp.settings
+        directly (milliseconds, no device re-initialization) and falls back to TLP if none apply
+      '';
+    };
+
+    # PerformanceInhibited = "high-operating-temperature" while on AC and hot
+    thermal = {
+      threshold = lib.mkOption {
+        type = lib.types.ints.positive;
+        default = 85;
+        description = "Temperature (°C) of the hottest thermal zone above which performance is reported as inhibited";
+      };
+
+      hysteresis = lib.mkOption {
+        type = lib.types.ints.unsigned;
+        default = 5;
+        description = "Degrees below the threshold the hottest zone must cool to before the inhibition clears";
+      };
+
+      pollInterval = lib.mkOption {
+        type = lib.types.ints.positive;
+        default = 10;
+        description = "Seconds between temperature samples (only taken while on AC)";
+      };
+    };
+
+    energySampleInterval = lib.mkOption {
+      type = lib.types.ints.unsigned;
+      default = 60;
+      description = ''
+        Seconds between battery power/energy samples attributed to the active profile in the
+        bridge's telemetry (GetStats on io.github.kostagorod.TlpBridge.Telemetry); 0 disables sampling
+      '';
+    };
   };
 
   config = lib.mkIf cfg.enable {
@@ -42,6 +85,11 @@ in
 
       environment = {
         TLP_PATH = "${pkgs.tlp}/bin/tlp";
+        BRIDGE_BACKEND = cfg.backend;
+        THERMAL_THRESHOLD_C = toString cfg.thermal.threshold;
+        THERMAL_HYSTERESIS_C = toString cfg.thermal.hysteresis;
+        THERMAL_POLL_SECONDS = toString cfg.thermal.pollInterval;
+        ENERGY_SAMPLE_SECONDS = toString cfg.energySampleInterval;
       };
 
       serviceConfig = {
@@ -57,7 +105,11 @@ in
         PrivateTmp = true;
         NoNewPrivileges = false;
         ReadOnlyPaths = [ "/" ];
-        ReadWritePaths = [ "/sys" ];
+        ReadWritePaths = [
+          "/sys"
+          # TLP run state (manual mode), written by tlp and the sysfs backend
+          "-/run/tlp"
+        ];
       };
     };
   };
@@ -0,0 +1,469 @@
+#!/usr/bin/env python3
+"""Offline test and benchmark harness for tlp-power-profiles-bridge.
+
+Starts the bridge unprivileged on a private dbus-daemon (BRIDGE_BUS=session)
+against a fake tlp/tlp-stat and a fake sysfs tree in a temporary directory,
+checks its D-Bus behaviour (profile switches, run state, holds, validation),
+then drives concurrent property-read clients, first alone and then while
+other clients keep switching profiles, and reports ops/s, p50/p99 latency
+and bridge RSS. Read latency during switches is what exposes work that
+blocks the main loop.
+
+Usage:
+    nix-shell -p dbus 'python3.withPackages (p: [ p.pygobject3 ])' \\
+        --run 'python3 bench.py --quick'
+    python3 bench.py --clients 64 --switch-clients 4 --backend sysfs
+"""
+
+import argparse
+import collections
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import gi
+gi.require_version('Gio', '2.0')
+gi.require_version('GLib', '2.0')
+from gi.repository import Gio, GLib
+
+BRIDGE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "tlp-power-profiles-bridge.py"
+)
+
+DBUS_NAME = "net.hadess.PowerProfiles"
+DBUS_PATH = "/net/hadess/PowerProfiles"
+PROPERTIES = "org.freedesktop.DBus.Properties"
+TELEMETRY_INTERFACE = "io.github.kostagorod.TlpBridge.Telemetry"
+
+READ_PROPERTIES = ("ActiveProfile", "PerformanceInhibited", "Profiles")
+SWITCH_PROFILES = ("performance", "power-saver", "balanced")
+
+# Profile switches wait out the bridge's rate limit, so allow for a queue
+CALL_TIMEOUT_MS = 60000
+
+# manual_mode contents each profile leaves in TLP's run directory
+RUN_STATE = {"performance": "0", "power-saver": "1", "balanced": None}
+
+FAKE_TLP = """#!/bin/sh
+sleep "${FAKE_TLP_DELAY:-0}"
+case "$1" in
+  ac) echo 0 > "$TLP_RUN_DIR/manual_mode" ;;
+  bat) echo 1 > "$TLP_RUN_DIR/manual_mode" ;;
+  start) rm -f "$TLP_RUN_DIR/manual_mode" ;;
+  *) echo "unknown command: $1" >&2; exit 1 ;;
+esac
+"""
+
+FAKE_TLP_STAT = """#!/bin/sh
+case "$(cat "$TLP_RUN_DIR/manual_mode" 2>/dev/null)" in
+  0) echo "Mode           = AC (manual)" ;;
+  1) echo "Mode           = battery (manual)" ;;
+  *) echo "Mode           = AC" ;;
+esac
+"""
+
+TLP_CONF = """CPU_SCALING_GOVERNOR_ON_AC=performance
+CPU_SCALING_GOVERNOR_ON_BAT=powersave
+CPU_ENERGY_PERF_POLICY_ON_AC=balance_performance
+CPU_ENERGY_PERF_POLICY_ON_BAT=power
+PLATFORM_PROFILE_ON_AC=performance
+PLATFORM_PROFILE_ON_BAT=low-power
+CPU_BOOST_ON_AC=1
+CPU_BOOST_ON_BAT=0
+"""
+
+
+def write(path: str, content: str, mode: int = 0o644) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(content)
+    os.chmod(path, mode)
+
+
+def make_fixture(workdir: str, cpus: int) -> dict:
+    """Create the fake TLP, run directory and sysfs tree; returns bridge env."""
+    sysfs = os.path.join(workdir, "sys")
+    files = {
+        "class/power_supply/AC/type": "Mains",
+        "class/power_supply/AC/online": "1",
+        "class/power_supply/BAT0/type": "Battery",
+        "class/power_supply/BAT0/status": "Full",
+        "class/power_supply/BAT0/power_now": "0",
+        "class/power_supply/BAT0/energy_now": "50000000",
+        "class/thermal/thermal_zone0/temp": "45000",
+        "devices/system/cpu/cpufreq/boost": "1",
+        "devices/system/cpu/intel_pstate/no_turbo": "0",
+        "firmware/acpi/platform_profile": "balanced",
+    }
+    for cpu in range(cpus):
+        policy = f"devices/system/cpu/cpufreq/policy{cpu}"
+        files[f"{policy}/scaling_governor"] = "powersave"
+        files[f"{policy}/energy_performance_preference"] = "balance_performance"
+    for name, value in files.items():
+        write(os.path.join(sysfs, name), value + "\n")
+
+    bin_dir = os.path.join(workdir, "bin")
+    write(os.path.join(bin_dir, "tlp"), FAKE_TLP, 0o755)
+    write(os.path.join(bin_dir, "tlp-stat"), FAKE_TLP_STAT, 0o755)
+    write(os.path.join(workdir, "etc/tlp.conf"), TLP_CONF)
+    run_dir = os.path.join(workdir, "run/tlp")
+    os.makedirs(run_dir)
+    return {
+        "TLP_PATH": os.path.join(bin_dir, "tlp"),
+        "TLP_RUN_DIR": run_dir,
+        "TLP_CONFIG": os.path.join(workdir, "etc/tlp.conf"),
+        "TLP_CONFIG_DIR": os.path.join(workdir, "etc/tlp.d"),
+        "SYSFS_ROOT": sysfs,
+    }
+
+
+def start_bus(workdir: str) -> tuple:
+    proc = subprocess.Popen(
+        [
+            "dbus-daemon",
+            "--session",
+            "--nofork",
+            "--print-address=1",
+            f"--address=unix:dir={workdir}",
+        ],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    address = proc.stdout.readline().strip()
+    if not address:
+        proc.kill()
+        raise RuntimeError("dbus-daemon did not start")
+    return proc, address
+
+
+def connect(address: str):
+    return Gio.DBusConnection.new_for_address_sync(
+        address,
+        Gio.DBusConnectionFlags.AUTHENTICATION_CLIENT
+        | Gio.DBusConnectionFlags.MESSAGE_BUS_CONNECTION,
+        None,
+        None,
+    )
+
+
+def call(conn, interface: str, method: str, params=None, reply_type=None):
+    return conn.call_sync(
+        DBUS_NAME,
+        DBUS_PATH,
+        interface,
+        method,
+        params,
+        GLib.VariantType(reply_type) if reply_type else None,
+        Gio.DBusCallFlags.NONE,
+        CALL_TIMEOUT_MS,
+        None,
+    )
+
+
+def get_property(conn, name: str):
+    params = GLib.Variant("(ss)", (DBUS_NAME, name))
+    return call(conn, PROPERTIES, "Get", params, "(v)").unpack()[0]
+
+
+def set_profile(conn, profile: str) -> None:
+    call(
+        conn,
+        PROPERTIES,
+        "Set",
+        GLib.Variant("(ssv)", (DBUS_NAME, "ActiveProfile", GLib.Variant("s", profile))),
+    )
+
+
+def get_stats(conn) -> dict:
+    reply = call(conn, TELEMETRY_INTERFACE, "GetStats", None, "(s)")
+    return json.loads(reply.unpack()[0])
+
+
+def start_bridge(workdir: str, address: str, env: dict, args):
+    env = dict(
+        os.environ,
+        **env,
+        DBUS_SESSION_BUS_ADDRESS=address,
+        BRIDGE_BUS="session",
+        BRIDGE_BACKEND=args.backend,
+        FAKE_TLP_DELAY=str(args.tlp_delay),
+        PYTHONUNBUFFERED="1",
+    )
+    proc = subprocess.Popen(
+        [sys.executable, BRIDGE],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=open(os.path.join(workdir, "bridge.log"), "w"),
+    )
+    conn = connect(address)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"bridge exited, see {workdir}/bridge.log")
+        reply = conn.call_sync(
+            "org.freedesktop.DBus",
+            "/org/freedesktop/DBus",
+            "org.freedesktop.DBus",
+            "NameHasOwner",
+            GLib.Variant("(s)", (DBUS_NAME,)),
+            GLib.VariantType("(b)"),
+            Gio.DBusCallFlags.NONE,
+            -1,
+            None,
+        )
+        if reply.unpack()[0]:
+            return proc
+        time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError("bridge did not claim its bus name within 30s")
+
+
+def wait_for(predicate, timeout: float = 30) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def run_checks(conn, env: dict, backend: str) -> list:
+    """Exercise the D-Bus API; returns a list of failure messages."""
+    failures = []
+    manual_mode = os.path.join(env["TLP_RUN_DIR"], "manual_mode")
+    governor = os.path.join(
+        env["SYSFS_ROOT"], "devices/system/cpu/cpufreq/policy0/scaling_governor"
+    )
+
+    def run_state():
+        try:
+            with open(manual_mode) as f:
+                return f.read().strip()
+        except FileNotFoundError:
+            return None
+
+    for profile in SWITCH_PROFILES:
+        set_profile(conn, profile)
+        if get_property(conn, "ActiveProfile") != profile:
+            failures.append(f"ActiveProfile is not {profile} after Set")
+        if run_state() != RUN_STATE[profile]:
+            failures.append(f"TLP run state is {run_state()!r} after {profile}")
+        if backend == "sysfs" and profile == "performance":
+            with open(governor) as f:
+                if f.read().strip() != "performance":
+                    failures.append("sysfs backend did not write the governor")
+
+    try:
+        set_profile(conn, "turbo")
+        failures.append("invalid profile was accepted")
+    except GLib.Error:
+        pass
+
+    cookie = call(
+        conn,
+        DBUS_NAME,
+        "HoldProfile",
+        GLib.Variant("(sss)", ("power-saver", "bench", "bench.py")),
+        "(u)",
+    ).unpack()[0]
+    if len(get_property(conn, "ActiveProfileHolds")) != 1:
+        failures.append("hold is not listed in ActiveProfileHolds")
+    if not wait_for(lambda: get_property(conn, "ActiveProfile") == "power-saver"):
+        failures.append("HoldProfile did not switch to power-saver")
+    call(conn, DBUS_NAME, "ReleaseProfile", GLib.Variant("(u)", (cookie,)))
+    if not wait_for(lambda: get_property(conn, "ActiveProfile") == "balanced"):
+        failures.append("ReleaseProfile did not restore balanced")
+
+    counters = get_stats(conn)["counters"]
+    if not counters.get("switch.tlp.ok") and not counters.get("switch.sysfs.ok"):
+        failures.append("telemetry recorded no successful switches")
+    return failures
+
+
+def run_load(address: str, args, switch_clients: int) -> tuple:
+    """Run read (and switch) clients for args.duration; returns results."""
+    loop = GLib.MainLoop()
+    latencies = collections.defaultdict(list)
+    errors = collections.Counter()
+    deadline = time.monotonic() + args.duration
+    active = args.clients + switch_clients
+
+    def finished():
+        nonlocal active
+        active -= 1
+        if not active:
+            loop.quit()
+
+    def client(conn, op: str, params):
+        """Issue calls back to back until the deadline."""
+
+        def issue(n=0):
+            if time.monotonic() >= deadline:
+                finished()
+                return
+            reply_type = GLib.VariantType("(v)") if op == "read" else None
+            conn.call(
+                DBUS_NAME,
+                DBUS_PATH,
+                PROPERTIES,
+                "Get" if op == "read" else "Set",
+                params(n),
+                reply_type,
+                Gio.DBusCallFlags.NONE,
+                CALL_TIMEOUT_MS,
+                None,
+                done,
+                (n, time.perf_counter()),
+            )
+
+        def done(conn, result, data):
+            n, started = data
+            try:
+                conn.call_finish(result)
+            except GLib.Error:
+                errors[op] += 1
+            else:
+                latencies[op].append(time.perf_counter() - started)
+            issue(n + 1)
+
+        issue()
+
+    for i in range(args.clients):
+        prop = READ_PROPERTIES[i % len(READ_PROPERTIES)]
+        client(
+            connect(address),
+            "read",
+            lambda n, prop=prop: GLib.Variant("(ss)", (DBUS_NAME, prop)),
+        )
+    for i in range(switch_clients):
+        client(
+            connect(address),
+            "switch",
+            lambda n, i=i: GLib.Variant(
+                "(ssv)",
+                (
+                    DBUS_NAME,
+                    "ActiveProfile",
+                    GLib.Variant("s", SWITCH_PROFILES[(i + n) % len(SWITCH_PROFILES)]),
+                ),
+            ),
+        )
+
+    started = time.monotonic()
+    loop.run()
+    return latencies, errors, time.monotonic() - started
+
+
+def rss_mb(pid: int) -> float:
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def percentile(values: list, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--clients", type=int, default=32, help="Read clients")
+    parser.add_argument(
+        "--switch-clients", type=int, default=2, help="Clients switching profiles"
+    )
+    parser.add_argument("--duration", type=float, default=15, help="Seconds per stage")
+    parser.add_argument("--backend", choices=("tlp", "sysfs"), default="tlp")
+    parser.add_argument(
+        "--tlp-delay", type=float, default=0.5, help="Seconds each fake tlp run takes"
+    )
+    parser.add_argument("--cpus", type=int, default=8, help="Fake cpufreq policies")
+    parser.add_argument("--skip-checks", action="store_true")
+    parser.add_argument("--json", action="store_true", help="Print JSON results")
+    parser.add_argument(
+        "--max-p99-ms", type=float, help="Exit non-zero if the read p99 exceeds this"
+    )
+    parser.add_argument(
+        "--quick", action="store_true", help="Small CI run (5s stages; 8 clients)"
+    )
+    args = parser.parse_args()
+    if args.quick:
+        args.duration, args.clients = 5, 8
+
+    results = []
+    failures = []
+    with tempfile.TemporaryDirectory(prefix="tlp-bridge-bench-") as workdir:
+        env = make_fixture(workdir, args.cpus)
+        bus, address = start_bus(workdir)
+        try:
+            bridge = start_bridge(workdir, address, env, args)
+            try:
+                conn = connect(address)
+                if not args.skip_checks:
+                    failures = run_checks(conn, env, args.backend)
+                stages = [("reads", 0)]
+                if args.switch_clients:
+                    stages.append(("reads+switches", args.switch_clients))
+                for stage, switch_clients in stages:
+                    latencies, errors, elapsed = run_load(address, args, switch_clients)
+                    rss = rss_mb(bridge.pid)
+                    for op in ("read", "switch"):
+                        samples = latencies.get(op, [])
+                        if not samples and not errors[op]:
+                            continue
+                        results.append({
+                            "stage": stage,
+                            "op": op,
+                            "count": len(samples),
+                            "errors": errors[op],
+                            "ops_per_s": round(len(samples) / elapsed, 1),
+                            "p50_ms": round(percentile(samples, 50) * 1000, 2),
+                            "p99_ms": round(percentile(samples, 99) * 1000, 2),
+                            "rss_mb": round(rss, 1),
+                        })
+                stats = get_stats(conn)
+            finally:
+                bridge.terminate()
+                bridge.wait(timeout=10)
+        finally:
+            bus.terminate()
+            bus.wait(timeout=10)
+
+    for row in results:
+        if row["errors"]:
+            failures.append(f"{row['errors']} {row['op']} errors in {row['stage']}")
+        if (args.max_p99_ms is not None and row["op"] == "read"
+                and row["p99_ms"] > args.max_p99_ms):
+            failures.append(f"read p99 {row['p99_ms']} ms in {row['stage']}")
+
+    if args.json:
+        print(json.dumps(
+            {"results": results, "bridge_stats": stats, "failures": failures},
+            indent=2
+        ))
+    else:
+        header = (
+            f"{'stage':<15} {'op':<7} {'count':>7} {'err':>4} {'ops/s':>9} "
+            f"{'p50 ms':>8} {'p99 ms':>8} {'rss MB':>7}"
+        )
+        print(header)
+        print("-" * len(header))
+        for r in results:
+            print(
+                f"{r['stage']:<15} {r['op']:<7} {r['count']:>7} {r['errors']:>4} "
+                f"{r['ops_per_s']:>9} {r['p50_ms']:>8} {r['p99_ms']:>8} "
+                f"{r['rss_mb']:>7}"
+            )
+        for failure in failures:
+            print(f"FAIL: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,6 +2,7 @@
   lib,
   python3,
   gobject-introspection,
+  libgudev,
   wrapGAppsHook3,
 }:
 
@@ -17,6 +18,11 @@ python3.pkgs.buildPythonApplication {
     wrapGAppsHook3
   ];
 
+  buildInputs = [
+    # GUdev typelib for power_supply uevents
+    libgudev
+  ];
+
   propagatedBuildInputs = [
     python3.pkgs.pygobject3
   ];
@@ -41,8 +47,14 @@ python3.pkgs.buildPythonApplication {
         <allow send_destination="net.hadess.PowerProfiles"/>
       </policy>
 
-      <!-- All users can read properties and set profile -->
+      <!-- All users can read properties, set profile and hold profiles -->
       <policy context="default">
+        <allow send_destination="net.hadess.PowerProfiles"
+               send_interface="net.hadess.PowerProfiles"
+               send_member="HoldProfile"/>
+        <allow send_destination="net.hadess.PowerProfiles"
+               send_interface="net.hadess.PowerProfiles"
+               send_member="ReleaseProfile"/>
         <allow send_destination="net.hadess.PowerProfiles"
                send_interface="org.freedesktop.DBus.Properties"
                send_member="Get"/>
@@ -54,6 +66,10 @@ python3.pkgs.buildPythonApplication {
                send_member="Set"/>
         <allow send_destination="net.hadess.PowerProfiles"
                send_interface="org.freedesktop.DBus.Introspectable"/>
+        <!-- Telemetry is readable by all; ResetStats stays root-only -->
+        <allow send_destination="net.hadess.PowerProfiles"
+               send_interface="io.github.kostagorod.TlpBridge.Telemetry"
+               send_member="GetStats"/>
       </policy>
     </busconfig>
     EOF
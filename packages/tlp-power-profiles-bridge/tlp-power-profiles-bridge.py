@@ -16,8 +16,30 @@ Profile mapping:
 - power-saver   -> tlp bat
 - balanced      -> tlp start (auto mode)
 - performance   -> tlp ac
+
+With BRIDGE_BACKEND=sysfs, switches write only the hot settings from TLP's
+own configuration (governor, EPP, platform profile, P-state limits, boost)
+for the target power source straight to sysfs and record the mode in TLP's
+run state, instead of re-running a full `tlp ac|bat|start`; TLP is still
+used if none of those settings can be applied.
+
+Applications can hold power-saver or performance (HoldProfile) while they
+run; power-saver holds win over performance holds, and the profile in use
+before the first hold is restored once the last one is released.
+
+The active profile is kept in memory and refreshed when TLP's run-state
+files change (inotify) or a power supply changes (udev), so property reads
+never spawn tlp-stat; it is only used when the run-state files are missing.
+
+Telemetry (counters, latency histograms for property reads and switches,
+and battery energy per active profile) is served as JSON by GetStats on
+the TELEMETRY_INTERFACE of the same object.
 """
 
+import bisect
+import collections
+import glob
+import json
 import subprocess
 import time
 import os
@@ -30,35 +52,247 @@ gi.require_version('Gio', '2.0')
 gi.require_version('GLib', '2.0')
 from gi.repository import Gio, GLib
 
+# udev power_supply events are optional (libgudev typelib)
+try:
+    gi.require_version('GUdev', '1.0')
+    from gi.repository import GUdev
+except (ValueError, ImportError):
+    GUdev = None
+
 # Constants
 DBUS_NAME = "net.hadess.PowerProfiles"
 DBUS_PATH = "/net/hadess/PowerProfiles"
+TELEMETRY_INTERFACE = "io.github.kostagorod.TlpBridge.Telemetry"
 
 # Valid profiles - strict whitelist
 VALID_PROFILES = frozenset(["power-saver", "balanced", "performance"])
 
+# Profiles applications may hold, strongest first
+HOLDABLE_PROFILES = ("power-saver", "performance")
+
+# Bus to serve on: "system", or "session" to run unprivileged against a
+# fake TLP (bench.py); root is only required on the system bus
+BRIDGE_BUS = os.environ.get("BRIDGE_BUS", "system")
+
 # TLP binary path - will be set by NixOS wrapper
 TLP_PATH = os.environ.get("TLP_PATH", "/run/current-system/sw/bin/tlp")
 
-# Rate limiting: minimum seconds between profile changes
+# TLP run-state directory: manual_mode exists while a manual mode (tlp ac/bat)
+# is active and holds 0 (AC) or 1 (battery); auto mode (tlp start) removes it
+TLP_RUN_DIR = os.environ.get("TLP_RUN_DIR", "/run/tlp")
+
+# Minimum seconds between tlp-stat fallbacks when run-state files are missing
+TLP_STAT_MIN_INTERVAL = 60
+
+# Coalesce bursts of inotify/udev events into one refresh
+REFRESH_DELAY_MS = 200
+
+# Safety-net re-read of the run-state files in case an event was missed
+RESYNC_SECONDS = 600
+
+# sysfs mount point (power supplies, thermal zones)
+SYSFS_ROOT = os.environ.get("SYSFS_ROOT", "/sys")
+
+# PerformanceInhibited: report high-operating-temperature above the threshold,
+# until the hottest zone drops HYSTERESIS below it; sampled every POLL seconds
+THERMAL_THRESHOLD_C = float(os.environ.get("THERMAL_THRESHOLD_C", "85"))
+THERMAL_HYSTERESIS_C = float(os.environ.get("THERMAL_HYSTERESIS_C", "5"))
+THERMAL_POLL_SECONDS = int(os.environ.get("THERMAL_POLL_SECONDS", "10"))
+
+# Profile switch backend: "tlp" runs tlp ac|bat|start, "sysfs" writes the
+# CPU/platform settings from TLP's config directly (falling back to tlp)
+BACKEND = os.environ.get("BRIDGE_BACKEND", "tlp")
+
+# TLP configuration: drop-ins first, tlp.conf overrides them
+TLP_CONFIG = os.environ.get("TLP_CONFIG", "/etc/tlp.conf")
+TLP_CONFIG_DIR = os.environ.get("TLP_CONFIG_DIR", "/etc/tlp.d")
+
+# Rate limiting: minimum seconds between profile changes (later ones wait)
 RATE_LIMIT_SECONDS = 2
-last_change_time = 0
+
+# Seconds before a hung tlp command is killed
+TLP_TIMEOUT_SECONDS = 10
+
+# Seconds between battery power/energy samples for telemetry (0 disables)
+ENERGY_SAMPLE_SECONDS = int(os.environ.get("ENERGY_SAMPLE_SECONDS", "60"))
 
 # D-Bus interface XML
 INTERFACE_XML = """
 <node>
   <interface name="net.hadess.PowerProfiles">
+    <method name="HoldProfile">
+      <arg name="profile" type="s" direction="in"/>
+      <arg name="reason" type="s" direction="in"/>
+      <arg name="application_id" type="s" direction="in"/>
+      <arg name="cookie" type="u" direction="out"/>
+    </method>
+    <method name="ReleaseProfile">
+      <arg name="cookie" type="u" direction="in"/>
+    </method>
+    <signal name="ProfileReleased">
+      <arg name="cookie" type="u"/>
+    </signal>
     <property name="ActiveProfile" type="s" access="readwrite"/>
     <property name="PerformanceInhibited" type="s" access="read"/>
+    <property name="PerformanceDegraded" type="s" access="read"/>
     <property name="Profiles" type="aa{sv}" access="read"/>
     <property name="Actions" type="as" access="read"/>
+    <property name="ActiveProfileHolds" type="aa{sv}" access="read"/>
+  </interface>
+  <interface name="io.github.kostagorod.TlpBridge.Telemetry">
+    <method name="GetStats">
+      <arg name="stats" type="s" direction="out"/>
+    </method>
+    <method name="ResetStats"/>
   </interface>
 </node>
 """
 
 
+class Histogram:
+    """Latency histogram with fixed millisecond buckets."""
+
+    BOUNDS_MS = (0.05, 0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000, 5000, 10000)
+
+    def __init__(self):
+        self.buckets = [0] * (len(self.BOUNDS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, seconds: float):
+        ms = seconds * 1000
+        self.buckets[bisect.bisect_left(self.BOUNDS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def to_dict(self) -> dict:
+        # Per-bucket (not cumulative) counts, keyed by upper bound in ms
+        labels = [f"{bound:g}" for bound in self.BOUNDS_MS] + ["+Inf"]
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "buckets": dict(zip(labels, self.buckets)),
+        }
+
+
+class Telemetry:
+    """In-memory counters, latency histograms and per-profile battery energy.
+
+    Battery samples are attributed to the profile active when they are
+    taken; only intervals spent discharging under a single profile count
+    towards its energy and time.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.started = time.monotonic()
+        self.counters = collections.Counter()
+        self.latency = collections.defaultdict(Histogram)
+        # profile -> {"samples", "seconds", "energy_wh", "power_w_total"}
+        self.energy = {}
+        self._last_sample = None
+
+    def count(self, name: str, amount: int = 1):
+        self.counters[name] += amount
+
+    def observe(self, name: str, seconds: float):
+        self.latency[name].observe(seconds)
+
+    def sample_battery(self, profile: str, batteries: list):
+        """Record one battery reading for profile."""
+        reading = read_batteries(batteries)
+        now = time.monotonic()
+        previous, self._last_sample = self._last_sample, (now, profile, reading)
+        if reading is None or not reading["discharging"]:
+            return
+        stats = self.energy.setdefault(profile, {
+            "samples": 0, "seconds": 0.0, "energy_wh": 0.0, "power_w_total": 0.0
+        })
+        stats["samples"] += 1
+        stats["power_w_total"] += reading["power_w"]
+        if previous is None:
+            return
+        then, previous_profile, previous_reading = previous
+        if (previous_profile == profile and previous_reading is not None
+                and previous_reading["discharging"]):
+            stats["seconds"] += now - then
+            # Energy readings can rise while discharging (recalibration)
+            stats["energy_wh"] += max(
+                previous_reading["energy_wh"] - reading["energy_wh"], 0.0
+            )
+
+    def snapshot(self) -> dict:
+        energy = {}
+        for profile, stats in self.energy.items():
+            hours = stats["seconds"] / 3600
+            energy[profile] = {
+                "samples": stats["samples"],
+                "discharging_seconds": round(stats["seconds"], 1),
+                "energy_wh": round(stats["energy_wh"], 4),
+                "mean_power_w": round(stats["power_w_total"] / stats["samples"], 3),
+                "mean_drain_w": round(stats["energy_wh"] / hours, 3) if hours else None,
+            }
+        return {
+            "uptime_seconds": round(time.monotonic() - self.started, 1),
+            "counters": dict(self.counters),
+            "latency": {name: h.to_dict() for name, h in self.latency.items()},
+            "energy": energy,
+        }
+
+
+# Shared by the module-level TLP helpers and the service
+telemetry = Telemetry()
+
+
+def parse_tlp_stat(output: str) -> str:
+    """Map `tlp-stat -s` output to a profile."""
+    for line in output.lower().splitlines():
+        key, _, value = line.partition("=")
+        if key.strip() != "mode":
+            continue
+        # Auto mode follows the power source; only a manual mode pins a profile
+        if "manual" not in value:
+            return "balanced"
+        if "ac" in value.split():
+            return "performance"
+        if "battery" in value:
+            return "power-saver"
+    return "balanced"
+
+
+def read_run_state() -> Optional[str]:
+    """Get the current profile from TLP's run-state files (no process spawn).
+
+    Returns None if TLP hasn't initialized its run directory yet.
+    """
+    if not os.path.isdir(TLP_RUN_DIR):
+        return None
+    try:
+        with open(os.path.join(TLP_RUN_DIR, "manual_mode"), "r") as f:
+            mode = f.read().strip()
+    except FileNotFoundError:
+        return "balanced"
+    except OSError as e:
+        print(f"Error reading TLP run state: {e}", file=sys.stderr)
+        return None
+    if mode == "0":
+        return "performance"
+    if mode == "1":
+        return "power-saver"
+    return "balanced"
+
+
 def get_tlp_mode() -> str:
-    """Get current TLP mode by checking tlp-stat."""
+    """Get current TLP mode from run-state files, falling back to tlp-stat."""
+    mode = read_run_state()
+    if mode is not None:
+        return mode
+    telemetry.count("tlp_stat_runs")
     try:
         result = subprocess.run(
             [TLP_PATH + "-stat", "-s"],
@@ -66,95 +300,671 @@ def get_tlp_mode() -> str:
             text=True,
             timeout=5
         )
-        output = result.stdout.lower()
-        
-        if "mode = ac" in output:
-            return "performance"
-        elif "mode = battery" in output:
-            return "power-saver"
-        else:
-            return "balanced"
+        return parse_tlp_stat(result.stdout)
     except Exception as e:
         print(f"Error getting TLP mode: {e}", file=sys.stderr)
         return "balanced"
 
 
-def set_tlp_mode(profile: str) -> bool:
-    """Set TLP mode. Returns True on success."""
-    global last_change_time
-    
-    # Security: strict profile validation
-    if profile not in VALID_PROFILES:
-        print(f"Security: rejected invalid profile '{profile}'", file=sys.stderr)
-        return False
-    
-    # Rate limiting
-    now = time.time()
-    if now - last_change_time < RATE_LIMIT_SECONDS:
-        print(f"Rate limited: too fast", file=sys.stderr)
-        return False
-    
-    # Map profile to TLP command
+def tlp_command(profile: str) -> list:
+    """Map a profile to its TLP command."""
     if profile == "power-saver":
-        cmd = [TLP_PATH, "bat"]
+        return [TLP_PATH, "bat"]
     elif profile == "performance":
-        cmd = [TLP_PATH, "ac"]
+        return [TLP_PATH, "ac"]
     else:  # balanced
-        cmd = [TLP_PATH, "start"]
-    
+        return [TLP_PATH, "start"]
+
+
+def set_tlp_mode(profile: str, on_done):
+    """Start switching TLP mode; calls on_done(ok, error) from the main loop."""
+    # Security: strict profile validation
+    if profile not in VALID_PROFILES:
+        print(f"Security: rejected invalid profile '{profile}'", file=sys.stderr)
+        on_done(False, f"Invalid profile: {profile}")
+        return
+
+    started = time.monotonic()
+
+    def done(ok, error, backend="tlp"):
+        result = "ok" if ok else "failed"
+        telemetry.count(f"switch.{backend}.{result}")
+        telemetry.observe(f"switch_apply.{backend}", time.monotonic() - started)
+        on_done(ok, error)
+
+    if BACKEND == "sysfs":
+        error = apply_sysfs_profile(profile)
+        if error is None:
+            print(f"Set profile to {profile} (sysfs)", file=sys.stderr)
+            done(True, "", backend="sysfs")
+            return
+        telemetry.count("switch.sysfs.fallback")
+        print(f"sysfs fast path failed ({error}), running TLP", file=sys.stderr)
+
     try:
-        # Security: no shell=True, direct exec
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            timeout=10
+        # Security: no shell, direct exec
+        proc = Gio.Subprocess.new(
+            tlp_command(profile),
+            Gio.SubprocessFlags.STDOUT_SILENCE | Gio.SubprocessFlags.STDERR_PIPE
         )
-        
-        if result.returncode == 0:
-            last_change_time = now
+    except GLib.Error as e:
+        print(f"Error setting TLP mode: {e.message}", file=sys.stderr)
+        done(False, e.message)
+        return
+
+    timeout = None
+
+    def kill():
+        # Returning SOURCE_REMOVE destroys the source, so forget its id
+        nonlocal timeout
+        timeout = None
+        print(f"TLP still running after {TLP_TIMEOUT_SECONDS}s, killing it", file=sys.stderr)
+        proc.force_exit()
+        return GLib.SOURCE_REMOVE
+
+    timeout = GLib.timeout_add_seconds(TLP_TIMEOUT_SECONDS, kill)
+
+    def finished(proc, result):
+        if timeout is not None:
+            GLib.source_remove(timeout)
+        try:
+            _, _, stderr = proc.communicate_utf8_finish(result)
+        except GLib.Error as e:
+            print(f"Error setting TLP mode: {e.message}", file=sys.stderr)
+            done(False, e.message)
+            return
+        if proc.get_if_exited() and proc.get_exit_status() == 0:
             print(f"Set profile to {profile}", file=sys.stderr)
-            return True
+            done(True, "")
         else:
-            print(f"TLP error: {result.stderr.decode()}", file=sys.stderr)
-            return False
-            
-    except Exception as e:
-        print(f"Error setting TLP mode: {e}", file=sys.stderr)
-        return False
+            print(f"TLP error: {stderr}", file=sys.stderr)
+            done(False, (stderr or "tlp failed").strip())
+
+    proc.communicate_utf8_async(None, None, finished)
+
+
+class ProfileSwitcher:
+    """Applies profile changes one at a time without blocking the main loop.
+
+    A request made while a switch is running (or waiting out the rate limit)
+    replaces any queued one, so the newest choice is always the one applied
+    next. Every waiting caller is answered once the final choice is applied.
+    """
+
+    def __init__(self, on_applied):
+        self.on_applied = on_applied
+        self.target = None
+        self.running = False
+        self.waiters = []
+        self.last_change = 0.0
+        self._delay_source = None
+        self._requested_at = None
 
+    @property
+    def busy(self) -> bool:
+        return self.running or self.target is not None
 
-def check_performance_inhibited() -> str:
-    """Check if performance mode is inhibited (e.g., on battery)."""
+    def request(self, profile: str, reply):
+        """Queue profile; reply(ok, error) is called when a switch settles."""
+        if self.target is not None:
+            telemetry.count("switch.superseded")
+            print(f"Superseding queued {self.target} with {profile}", file=sys.stderr)
+        if not self.waiters:
+            self._requested_at = time.monotonic()
+        self.target = profile
+        self.waiters.append(reply)
+        self._start()
+
+    def _start(self):
+        if self.running or self._delay_source is not None or self.target is None:
+            return
+        # Rate limiting: delay (never drop) changes that come too fast
+        wait = RATE_LIMIT_SECONDS - (time.monotonic() - self.last_change)
+        if wait > 0:
+            telemetry.count("switch.rate_limited")
+            self._delay_source = GLib.timeout_add(int(wait * 1000), self._delayed)
+            return
+        profile, self.target = self.target, None
+        self.running = True
+        set_tlp_mode(profile, lambda ok, error: self._finished(profile, ok, error))
+
+    def _delayed(self):
+        self._delay_source = None
+        self._start()
+        return GLib.SOURCE_REMOVE
+
+    def _finished(self, profile: str, ok: bool, error: str):
+        self.running = False
+        self.last_change = time.monotonic()
+        if ok:
+            self.on_applied(profile)
+        if self.target is not None:
+            # Superseded while running: callers wait for the newer choice
+            self._start()
+            return
+        # Request-to-reply time, including rate limiting and superseded runs
+        telemetry.observe("switch_request", time.monotonic() - self._requested_at)
+        waiters, self.waiters = self.waiters, []
+        for reply in waiters:
+            reply(ok, error)
+
+
+def read_sysfs(path: str) -> Optional[str]:
+    """Read a sysfs attribute, or None if it can't be read."""
     try:
-        # Check if on battery
-        with open("/sys/class/power_supply/AC/online", "r") as f:
-            if f.read().strip() == "0":
-                return "on-battery"
-    except FileNotFoundError:
-        pass
-    
-    # Check thermal throttling
+        with open(path, "r") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+# Supply types that can power the machine: AC adapters, and USB(-C) chargers
+# on laptops without a barrel connector
+AC_SUPPLY_TYPES = ("Mains", "USB")
+
+
+def discover_mains() -> list:
+    """Return the online attribute of every AC power supply (mains or USB)."""
+    base = os.path.join(SYSFS_ROOT, "class/power_supply")
     try:
-        for i in range(10):
-            path = f"/sys/class/thermal/thermal_zone{i}/temp"
-            if os.path.exists(path):
-                with open(path, "r") as f:
-                    temp = int(f.read().strip()) / 1000
-                    if temp > 85:  # 85°C threshold
-                        return "high-operating-temperature"
-    except Exception:
-        pass
-    
-    return ""
+        names = sorted(os.listdir(base))
+    except OSError:
+        return []
+    return [
+        os.path.join(base, name, "online")
+        for name in names
+        if read_sysfs(os.path.join(base, name, "type")) in AC_SUPPLY_TYPES
+        and os.path.exists(os.path.join(base, name, "online"))
+    ]
+
+
+def discover_batteries() -> list:
+    """Return the directory of every battery power supply."""
+    base = os.path.join(SYSFS_ROOT, "class/power_supply")
+    try:
+        names = sorted(os.listdir(base))
+    except OSError:
+        return []
+    return [
+        os.path.join(base, name)
+        for name in names
+        if read_sysfs(os.path.join(base, name, "type")) == "Battery"
+    ]
+
+
+def read_batteries(batteries: list) -> Optional[dict]:
+    """Sum power (W) and remaining energy (Wh) over batteries.
+
+    Batteries that report charge/current instead of energy/power are
+    converted with voltage_now. Returns None if nothing could be read.
+    """
+    def attribute(path, name):
+        value = read_sysfs(os.path.join(path, name))
+        return int(value) if value and value.lstrip("-").isdigit() else None
+
+    power_uw = energy_uwh = 0
+    discharging = found = False
+    for path in batteries:
+        voltage = attribute(path, "voltage_now")
+        power = attribute(path, "power_now")
+        if power is None and voltage is not None:
+            current = attribute(path, "current_now")
+            power = current * voltage // 1000000 if current is not None else None
+        energy = attribute(path, "energy_now")
+        if energy is None and voltage is not None:
+            charge = attribute(path, "charge_now")
+            energy = charge * voltage // 1000000 if charge is not None else None
+        if power is None or energy is None:
+            continue
+        found = True
+        # Some drivers report a negative current while discharging
+        power_uw += abs(power)
+        energy_uwh += energy
+        discharging |= read_sysfs(os.path.join(path, "status")) == "Discharging"
+    if not found:
+        return None
+    return {
+        "discharging": discharging,
+        "power_w": power_uw / 1000000,
+        "energy_wh": energy_uwh / 1000000,
+    }
+
+
+def discover_thermal_zones() -> list:
+    """Return the temp attribute of every thermal zone."""
+    base = os.path.join(SYSFS_ROOT, "class/thermal")
+    try:
+        names = sorted(os.listdir(base))
+    except OSError:
+        return []
+    return [
+        os.path.join(base, name, "temp")
+        for name in names
+        if name.startswith("thermal_zone")
+        and os.path.exists(os.path.join(base, name, "temp"))
+    ]
+
+
+def read_tlp_config() -> dict:
+    """Parse TLP's KEY=VALUE settings."""
+    paths = sorted(glob.glob(os.path.join(TLP_CONFIG_DIR, "*.conf")))
+    paths.append(TLP_CONFIG)
+    config = {}
+    for path in paths:
+        try:
+            with open(path, "r") as f:
+                lines = f.readlines()
+        except OSError:
+            continue
+        for line in lines:
+            line = line.strip()
+            if not line or line.startswith("#") or "=" not in line:
+                continue
+            key, _, value = line.partition("=")
+            config[key.strip()] = value.strip().strip('"')
+    return config
+
+
+def sysfs_settings(config: dict, power: str) -> list:
+    """List (path glob, value) writes for TLP's AC or BAT settings, in order."""
+    cpu = os.path.join(SYSFS_ROOT, "devices/system/cpu")
+    policies = os.path.join(cpu, "cpufreq/policy*")
+    pstate = os.path.join(cpu, "intel_pstate")
+
+    def setting(name):
+        return config.get(f"{name}_ON_{power}")
+
+    writes = []
+    # Governor before EPP: the governor resets EPP on some drivers
+    if setting("CPU_SCALING_GOVERNOR"):
+        writes.append((f"{policies}/scaling_governor", setting("CPU_SCALING_GOVERNOR")))
+    if setting("CPU_ENERGY_PERF_POLICY"):
+        writes.append((
+            f"{policies}/energy_performance_preference",
+            setting("CPU_ENERGY_PERF_POLICY")
+        ))
+    if setting("PLATFORM_PROFILE"):
+        writes.append((
+            os.path.join(SYSFS_ROOT, "firmware/acpi/platform_profile"),
+            setting("PLATFORM_PROFILE")
+        ))
+    # min, max, min again: one order fails whenever the ranges don't overlap
+    min_perf, max_perf = setting("CPU_MIN_PERF"), setting("CPU_MAX_PERF")
+    if min_perf:
+        writes.append((f"{pstate}/min_perf_pct", min_perf))
+    if max_perf:
+        writes.append((f"{pstate}/max_perf_pct", max_perf))
+    if min_perf and max_perf:
+        writes.append((f"{pstate}/min_perf_pct", min_perf))
+    boost = setting("CPU_BOOST")
+    if boost in ("0", "1"):
+        writes.append((os.path.join(cpu, "cpufreq/boost"), boost))
+        writes.append((f"{pstate}/no_turbo", "1" if boost == "0" else "0"))
+    return writes
+
+
+def apply_sysfs_profile(profile: str) -> Optional[str]:
+    """Apply a profile's hot settings via sysfs; returns an error or None.
+
+    Like tlp ac/bat/start, performance and power-saver use the AC and BAT
+    settings and set TLP's manual mode, and balanced uses the settings of
+    the current power source and returns TLP to auto mode.
+    """
+    if not os.path.isdir(TLP_RUN_DIR):
+        return "TLP has not initialized"
+    if profile == "performance":
+        power = "AC"
+    elif profile == "power-saver":
+        power = "BAT"
+    else:
+        mains = discover_mains()
+        on_ac = not mains or any(read_sysfs(path) == "1" for path in mains)
+        power = "AC" if on_ac else "BAT"
+
+    applied = 0
+    for pattern, value in sysfs_settings(read_tlp_config(), power):
+        for path in sorted(glob.glob(pattern)):
+            try:
+                with open(path, "w") as f:
+                    f.write(value)
+                applied += 1
+            except OSError as e:
+                # e.g. EPP is locked while the performance governor is active
+                print(f"Could not write {value} to {path}: {e}", file=sys.stderr)
+    if not applied:
+        return "no TLP CPU/platform settings could be applied"
+
+    # Record the mode where TLP (and TlpModeMonitor) expect it
+    manual_mode = os.path.join(TLP_RUN_DIR, "manual_mode")
+    try:
+        if profile == "balanced":
+            if os.path.exists(manual_mode):
+                os.remove(manual_mode)
+        else:
+            with open(manual_mode, "w") as f:
+                f.write("0\n" if power == "AC" else "1\n")
+    except OSError as e:
+        return f"could not update TLP run state: {e}"
+    return None
+
+
+class PowerMonitor:
+    """Caches PerformanceInhibited and reports transitions.
+
+    Power supplies and thermal zones are discovered once. AC state is
+    refreshed on udev power_supply events; temperatures are sampled every
+    THERMAL_POLL_SECONDS, and only while on AC (on battery, "on-battery"
+    wins regardless of temperature). The temperature state has hysteresis
+    so it doesn't flap around the threshold.
+    """
+
+    def __init__(self, on_change):
+        self.on_change = on_change
+        self.mains = discover_mains()
+        self.zones = discover_thermal_zones()
+        self.hot = False
+        self._udev = False
+        self._timer = None
+        self.state = self._evaluate()
+        print(
+            f"Monitoring {len(self.mains)} AC adapters and "
+            f"{len(self.zones)} thermal zones",
+            file=sys.stderr
+        )
+
+    def start(self, udev_client=None):
+        """Start watching (call once the main loop exists)."""
+        if udev_client is not None:
+            self._udev = True
+            udev_client.connect("uevent", lambda *args: self.refresh())
+        self._update_timer()
+
+    def on_battery(self) -> bool:
+        # Without any AC supply (desktops, unknown hardware) assume AC
+        if not self.mains:
+            return False
+        return not any(read_sysfs(path) == "1" for path in self.mains)
+
+    def max_temperature(self) -> float:
+        temps = []
+        for path in self.zones:
+            value = read_sysfs(path)
+            if value and value.lstrip("-").isdigit():
+                temps.append(int(value) / 1000)
+        return max(temps, default=0.0)
+
+    def _evaluate(self) -> str:
+        if self.on_battery():
+            return "on-battery"
+        limit = THERMAL_THRESHOLD_C
+        if self.hot:
+            limit -= THERMAL_HYSTERESIS_C
+        self.hot = self.max_temperature() > limit
+        return "high-operating-temperature" if self.hot else ""
+
+    @property
+    def degraded(self) -> str:
+        """PerformanceDegraded: only thermal; being on battery isn't degradation."""
+        return self.state if self.state == "high-operating-temperature" else ""
+
+    def refresh(self):
+        state, previous = self._evaluate(), self.state
+        self.state = state
+        self._update_timer()
+        if state != previous:
+            self.on_change(state)
+
+    def _update_timer(self):
+        # Sample while on AC; without udev the timer also catches AC changes
+        wanted = bool(self.zones) and (self.state != "on-battery" or not self._udev)
+        if wanted and self._timer is None:
+            self._timer = GLib.timeout_add_seconds(THERMAL_POLL_SECONDS, self._tick)
+        elif not wanted and self._timer is not None:
+            GLib.source_remove(self._timer)
+            self._timer = None
+
+    def _tick(self):
+        # This source ends here; refresh() re-arms it if still wanted
+        self._timer = None
+        self.refresh()
+        return GLib.SOURCE_REMOVE
+
+
+class TlpModeMonitor:
+    """Keeps the active profile in memory and reports changes.
+
+    Refreshes come from inotify on TLP_RUN_DIR and udev power_supply events;
+    tlp-stat (asynchronous, rate limited) is only used while the run-state
+    files are unavailable.
+    """
+
+    def __init__(self, on_change):
+        self.mode = get_tlp_mode()
+        self.on_change = on_change
+        self._file_monitor = None
+        self._refresh_source = None
+        self._last_tlp_stat = 0.0
+
+    def start(self, udev_client=None):
+        """Start watching for mode changes (call once the main loop exists)."""
+        run_dir = Gio.File.new_for_path(TLP_RUN_DIR)
+        self._file_monitor = run_dir.monitor_directory(
+            Gio.FileMonitorFlags.NONE, None
+        )
+        self._file_monitor.connect("changed", lambda *args: self.schedule_refresh())
+
+        if udev_client is not None:
+            udev_client.connect("uevent", lambda *args: self.schedule_refresh())
+
+        GLib.timeout_add_seconds(RESYNC_SECONDS, self._resync)
+
+    def update(self, mode: str):
+        """Record a new mode, notifying on_change(mode, previous) if it differs."""
+        if mode == self.mode:
+            return
+        previous, self.mode = self.mode, mode
+        self.on_change(mode, previous)
+
+    def schedule_refresh(self):
+        if self._refresh_source is None:
+            self._refresh_source = GLib.timeout_add(REFRESH_DELAY_MS, self._refresh)
+
+    def _resync(self):
+        self.schedule_refresh()
+        return GLib.SOURCE_CONTINUE
+
+    def _refresh(self):
+        self._refresh_source = None
+        mode = read_run_state()
+        if mode is not None:
+            self.update(mode)
+        elif time.monotonic() - self._last_tlp_stat >= TLP_STAT_MIN_INTERVAL:
+            self._last_tlp_stat = time.monotonic()
+            self._run_tlp_stat()
+        return GLib.SOURCE_REMOVE
+
+    def _run_tlp_stat(self):
+        telemetry.count("tlp_stat_runs")
+        try:
+            proc = Gio.Subprocess.new(
+                [TLP_PATH + "-stat", "-s"], Gio.SubprocessFlags.STDOUT_PIPE
+            )
+        except GLib.Error as e:
+            print(f"Error getting TLP mode: {e.message}", file=sys.stderr)
+            return
+
+        def done(proc, result):
+            try:
+                _, stdout, _ = proc.communicate_utf8_finish(result)
+            except GLib.Error as e:
+                print(f"Error getting TLP mode: {e.message}", file=sys.stderr)
+                return
+            self.update(parse_tlp_stat(stdout or ""))
+
+        proc.communicate_utf8_async(None, None, done)
 
 
 class PowerProfilesService:
     """D-Bus service implementing net.hadess.PowerProfiles."""
     
     def __init__(self):
-        self.current_profile = get_tlp_mode()
+        self.mode_monitor = TlpModeMonitor(self._on_mode_changed)
+        self.switcher = ProfileSwitcher(self.mode_monitor.update)
+        self.power_monitor = PowerMonitor(self._on_inhibited_changed)
+        self._degraded = self.power_monitor.degraded
+        self.udev_client = None
         self.connection = None
         self.registration_id = None
+        self.batteries = discover_batteries()
+
+        # cookie -> {"profile", "reason", "application_id", "sender"}
+        self.holds = {}
+        self._next_cookie = 1
+        # sender -> name watch id, to drop holds of clients that disconnect
+        self._sender_watches = {}
+        # Profile to go back to once the last hold is released
+        self.profile_before_holds = None
+
+    @property
+    def current_profile(self) -> str:
+        return self.mode_monitor.mode
+
+    def _emit_properties_changed(self, changed: dict):
+        """Emit PropertiesChanged for the given {name: Variant} values."""
+        if self.connection is None:
+            return
+        self.connection.emit_signal(
+            None,
+            DBUS_PATH,
+            "org.freedesktop.DBus.Properties",
+            "PropertiesChanged",
+            GLib.Variant("(sa{sv}as)", (DBUS_NAME, changed, []))
+        )
+
+    def _on_mode_changed(self, profile: str, previous: str):
+        print(f"Active profile is now {profile}", file=sys.stderr)
+        telemetry.count("profile_changes")
+        # Close the energy interval of the profile that was running until
+        # now, then start a fresh one for the new profile
+        self._sample_energy(previous)
+        self._sample_energy()
+        self._emit_properties_changed({"ActiveProfile": GLib.Variant("s", profile)})
+
+    def _sample_energy(self, profile: Optional[str] = None):
+        if self.batteries and ENERGY_SAMPLE_SECONDS > 0:
+            telemetry.sample_battery(profile or self.current_profile, self.batteries)
+        return GLib.SOURCE_CONTINUE
+
+    def _get_stats(self) -> str:
+        """Return the telemetry snapshot served by GetStats."""
+        stats = telemetry.snapshot()
+        stats.update({
+            "active_profile": self.current_profile,
+            "performance_inhibited": self.power_monitor.state,
+            "performance_degraded": self.power_monitor.degraded,
+            "backend": BACKEND,
+            "holds": len(self.holds),
+        })
+        return json.dumps(stats, sort_keys=True)
+
+    def _on_inhibited_changed(self, reason: str):
+        print(f"Performance inhibited: {reason or 'no'}", file=sys.stderr)
+        changed = {"PerformanceInhibited": GLib.Variant("s", reason)}
+        degraded = self.power_monitor.degraded
+        if degraded != self._degraded:
+            self._degraded = degraded
+            changed["PerformanceDegraded"] = GLib.Variant("s", degraded)
+        self._emit_properties_changed(changed)
+
+    def _get_holds(self):
+        """Return ActiveProfileHolds in D-Bus format."""
+        return [
+            {"ApplicationId": GLib.Variant("s", hold["application_id"]),
+             "Profile": GLib.Variant("s", hold["profile"]),
+             "Reason": GLib.Variant("s", hold["reason"])}
+            for hold in self.holds.values()
+        ]
+
+    def _held_profile(self) -> Optional[str]:
+        """The profile the current holds ask for, or None without holds."""
+        held = {hold["profile"] for hold in self.holds.values()}
+        for profile in HOLDABLE_PROFILES:
+            if profile in held:
+                return profile
+        return None
+
+    def _apply_holds(self):
+        """Switch to the held profile, or back to the pre-hold one."""
+        target = self._held_profile() or self.profile_before_holds
+        if target is None:
+            return
+        if not self.holds:
+            self.profile_before_holds = None
+        if target != self.current_profile or self.switcher.busy:
+            self.switcher.request(target, self._log_switch)
+
+    @staticmethod
+    def _log_switch(ok, error):
+        if not ok:
+            print(f"Hold profile switch failed: {error}", file=sys.stderr)
+
+    def _hold_profile(self, sender, profile, reason, application_id) -> int:
+        if not self.holds:
+            self.profile_before_holds = self.current_profile
+        cookie = self._next_cookie
+        self._next_cookie += 1
+        self.holds[cookie] = {
+            "profile": profile,
+            "reason": reason,
+            "application_id": application_id,
+            "sender": sender,
+        }
+        if sender not in self._sender_watches:
+            self._sender_watches[sender] = Gio.bus_watch_name_on_connection(
+                self.connection,
+                sender,
+                Gio.BusNameWatcherFlags.NONE,
+                None,
+                lambda conn, name: self._release_sender(name)
+            )
+        print(
+            f"{application_id} ({sender}) holds {profile}: {reason}",
+            file=sys.stderr
+        )
+        self._emit_properties_changed(
+            {"ActiveProfileHolds": GLib.Variant("aa{sv}", self._get_holds())}
+        )
+        self._apply_holds()
+        return cookie
+
+    def _release_holds(self, cookies, apply=True):
+        """Drop holds, emitting ProfileReleased for each."""
+        for cookie in cookies:
+            hold = self.holds.pop(cookie)
+            print(f"Released {hold['profile']} hold {cookie}", file=sys.stderr)
+            self.connection.emit_signal(
+                None,
+                DBUS_PATH,
+                DBUS_NAME,
+                "ProfileReleased",
+                GLib.Variant("(u)", (cookie,))
+            )
+            sender = hold["sender"]
+            still_holding = any(h["sender"] == sender for h in self.holds.values())
+            if not still_holding and sender in self._sender_watches:
+                Gio.bus_unwatch_name(self._sender_watches.pop(sender))
+        self._emit_properties_changed(
+            {"ActiveProfileHolds": GLib.Variant("aa{sv}", self._get_holds())}
+        )
+        if apply:
+            self._apply_holds()
+
+    def _release_sender(self, sender):
+        """Drop every hold of a client that left the bus."""
+        cookies = [c for c, hold in self.holds.items() if hold["sender"] == sender]
+        if cookies:
+            print(f"{sender} vanished, releasing its holds", file=sys.stderr)
+            self._release_holds(cookies)
         
     def _get_profiles(self):
         """Return available profiles in D-Bus format."""
@@ -173,7 +983,56 @@ class PowerProfilesService:
     def _handle_method_call(self, connection, sender, object_path, interface_name,
                             method_name, parameters, invocation):
         """Handle D-Bus method calls."""
-        # net.hadess.PowerProfiles doesn't define methods, only properties
+        # Property writes land here (no set_property handler) so the reply
+        # can wait until TLP has applied the profile
+        if (interface_name == "org.freedesktop.DBus.Properties"
+                and method_name == "Set"):
+            _, property_name, value = parameters.unpack()
+            if property_name == "ActiveProfile":
+                self._set_active_profile(sender, value, invocation)
+                return
+
+        if interface_name == DBUS_NAME and method_name == "HoldProfile":
+            profile, reason, application_id = parameters.unpack()
+            # Security: only the holdable profiles
+            if profile not in HOLDABLE_PROFILES:
+                invocation.return_error_literal(
+                    Gio.dbus_error_quark(),
+                    Gio.DBusError.INVALID_ARGS,
+                    f"Only {' and '.join(HOLDABLE_PROFILES)} can be held"
+                )
+                return
+            telemetry.count("holds")
+            cookie = self._hold_profile(sender, profile, reason, application_id)
+            invocation.return_value(GLib.Variant("(u)", (cookie,)))
+            return
+
+        if interface_name == DBUS_NAME and method_name == "ReleaseProfile":
+            (cookie,) = parameters.unpack()
+            # Security: a client can only release its own holds
+            hold = self.holds.get(cookie)
+            if hold is None or hold["sender"] != sender:
+                invocation.return_error_literal(
+                    Gio.dbus_error_quark(),
+                    Gio.DBusError.INVALID_ARGS,
+                    f"No hold with cookie {cookie}"
+                )
+                return
+            self._release_holds([cookie])
+            invocation.return_value(None)
+            return
+
+        if interface_name == TELEMETRY_INTERFACE and method_name == "GetStats":
+            invocation.return_value(GLib.Variant("(s)", (self._get_stats(),)))
+            return
+
+        # Only root may reset (see the D-Bus policy)
+        if interface_name == TELEMETRY_INTERFACE and method_name == "ResetStats":
+            print(f"Telemetry reset by {sender}", file=sys.stderr)
+            telemetry.reset()
+            invocation.return_value(None)
+            return
+
         invocation.return_error_literal(
             Gio.dbus_error_quark(),
             Gio.DBusError.UNKNOWN_METHOD,
@@ -183,49 +1042,65 @@ class PowerProfilesService:
     def _handle_get_property(self, connection, sender, object_path,
                              interface_name, property_name):
         """Handle D-Bus property reads."""
+        started = time.monotonic()
+        value = self._property_value(property_name)
+        telemetry.count(f"property_reads.{property_name}")
+        telemetry.observe("property_read", time.monotonic() - started)
+        return value
+
+    def _property_value(self, property_name):
         if property_name == "ActiveProfile":
-            self.current_profile = get_tlp_mode()
             return GLib.Variant("s", self.current_profile)
         elif property_name == "PerformanceInhibited":
-            return GLib.Variant("s", check_performance_inhibited())
+            return GLib.Variant("s", self.power_monitor.state)
+        elif property_name == "PerformanceDegraded":
+            return GLib.Variant("s", self.power_monitor.degraded)
         elif property_name == "Profiles":
             profiles = self._get_profiles()
             return GLib.Variant("aa{sv}", profiles)
         elif property_name == "Actions":
             return GLib.Variant("as", [])
+        elif property_name == "ActiveProfileHolds":
+            return GLib.Variant("aa{sv}", self._get_holds())
         
         return None
     
-    def _handle_set_property(self, connection, sender, object_path,
-                             interface_name, property_name, value):
-        """Handle D-Bus property writes."""
-        if property_name == "ActiveProfile":
-            new_profile = value.get_string()
-            
-            # Security: validate before processing
-            if new_profile not in VALID_PROFILES:
-                print(f"Security: rejected invalid profile from {sender}", file=sys.stderr)
-                return False
-            
-            if set_tlp_mode(new_profile):
-                self.current_profile = new_profile
-                # Emit PropertiesChanged signal
-                changed = {"ActiveProfile": GLib.Variant("s", new_profile)}
-                self.connection.emit_signal(
-                    None,
-                    DBUS_PATH,
-                    "org.freedesktop.DBus.Properties",
-                    "PropertiesChanged",
-                    GLib.Variant("(sa{sv}as)", (interface_name, changed, []))
+    def _set_active_profile(self, sender, new_profile, invocation):
+        """Handle an ActiveProfile write, replying once it has been applied."""
+        # Security: validate before processing
+        if new_profile not in VALID_PROFILES:
+            print(f"Security: rejected invalid profile from {sender}", file=sys.stderr)
+            invocation.return_error_literal(
+                Gio.dbus_error_quark(),
+                Gio.DBusError.INVALID_ARGS,
+                f"Invalid profile: {new_profile}"
+            )
+            return
+
+        telemetry.count("profile_sets")
+        # An explicit choice overrides every application hold
+        if self.holds:
+            self._release_holds(list(self.holds), apply=False)
+            self.profile_before_holds = None
+
+        if new_profile == self.current_profile and not self.switcher.busy:
+            invocation.return_value(None)
+            return
+
+        def reply(ok, error):
+            if ok:
+                invocation.return_value(None)
+            else:
+                invocation.return_error_literal(
+                    Gio.dbus_error_quark(), Gio.DBusError.FAILED, error
                 )
-                return True
-            
-        return False
-    
+
+        self.switcher.request(new_profile, reply)
+
     def run(self):
         """Start the D-Bus service."""
         # Security: verify running as root (required for TLP)
-        if os.geteuid() != 0:
+        if BRIDGE_BUS == "system" and os.geteuid() != 0:
             print("Error: must run as root for TLP access", file=sys.stderr)
             sys.exit(1)
         
@@ -234,8 +1109,9 @@ class PowerProfilesService:
             print(f"Error: TLP not found at {TLP_PATH}", file=sys.stderr)
             sys.exit(1)
         
-        # Get system bus
-        self.connection = Gio.bus_get_sync(Gio.BusType.SYSTEM, None)
+        # Get the system bus (session bus only for the bench harness)
+        bus_type = Gio.BusType.SESSION if BRIDGE_BUS == "session" else Gio.BusType.SYSTEM
+        self.connection = Gio.bus_get_sync(bus_type, None)
         
         # Request the bus name
         Gio.bus_own_name_on_connection(
@@ -256,9 +1132,26 @@ class PowerProfilesService:
             interface_info,
             self._handle_method_call,
             self._handle_get_property,
-            self._handle_set_property
+            None  # ActiveProfile writes go through _handle_method_call
+        )
+        self.connection.register_object(
+            DBUS_PATH,
+            node_info.lookup_interface(TELEMETRY_INTERFACE),
+            self._handle_method_call,
+            None,
+            None
         )
         
+        # One udev client feeds both monitors
+        if GUdev is not None:
+            self.udev_client = GUdev.Client.new(["power_supply"])
+        self.mode_monitor.start(self.udev_client)
+        self.power_monitor.start(self.udev_client)
+
+        if self.batteries and ENERGY_SAMPLE_SECONDS > 0:
+            self._sample_energy()
+            GLib.timeout_add_seconds(ENERGY_SAMPLE_SECONDS, self._sample_energy)
+
         print(f"TLP power-profiles bridge started", file=sys.stderr)
         print(f"Current profile: {self.current_profile}", file=sys.stderr)
         